@@ -0,0 +1,110 @@
+#!/usr/bin/env python
+"""Updates/second of the local orderbook.
+
+Compares the previous `handle_orderbook_delta`, which rebuilt a dict of both
+sides from the last snapshot on every delta, with the incremental
+`OrderBook`. Deltas are generated randomly around a fixed mid price and both
+books are checked to hold the same levels at the end.
+
+Usage: python benchmarks/orderbook_delta.py [-n N_DELTAS] [-d DEPTH]
+"""
+
+import time
+import random
+import argparse
+
+from cryptoex.orderbook import OrderBook
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-n", "--deltas", type=int, default=20_000)
+parser.add_argument("-d", "--depth", type=int, default=200)
+
+TICK = 0.1
+MID = 30000.0
+
+
+def price(ticks: int) -> str:
+    return f"{MID + ticks * TICK:.1f}"
+
+
+def make_messages(n: int, depth: int):
+    rng = random.Random(42)
+    snapshot = {
+        "topic": "orderbook.200.BTCUSDT",
+        "type": "snapshot",
+        "ts": 0,
+        "data": {
+            "s": "BTCUSDT",
+            "b": [[price(-i), "1.000"] for i in range(1, depth + 1)],
+            "a": [[price(i), "1.000"] for i in range(1, depth + 1)],
+            "u": 1,
+            "seq": 1,
+        },
+    }
+    messages = [snapshot]
+    for u in range(2, n + 2):
+        data = {"s": "BTCUSDT", "b": [], "a": [], "u": u, "seq": u}
+        for _ in range(rng.randint(1, 6)):
+            side, sign = rng.choice((("b", -1), ("a", 1)))
+            size = rng.choice(("0", f"{rng.random() * 5:.3f}"))
+            data[side].append([price(sign * rng.randint(1, depth + 20)), size])
+        messages.append({**snapshot, "type": "delta", "ts": u, "data": data})
+    return messages
+
+
+def rebuild_handler():
+    """`handle_orderbook_delta` as it was."""
+    previous_snapshot = {}
+
+    def handle_orderbook_delta(message):
+        topic = message["topic"]
+        new_message = {**message}
+        if message["type"] != "snapshot":
+            data = {}
+            for side in ("b", "a"):
+                prices = message["data"][side]
+                prev_prices = {k: v for k, v in previous_snapshot[topic]["data"][side]}
+                for price, volume in prices:
+                    if volume == "0":
+                        if price in prev_prices:
+                            del prev_prices[price]
+                    else:
+                        prev_prices[price] = volume
+                data[side] = [[k, v] for k, v in prev_prices.items()]
+            new_message["type"] = "snapshot"
+            new_message["data"] = message["data"] | data
+        previous_snapshot[topic] = new_message
+        return new_message
+
+    return handle_orderbook_delta
+
+
+def bench(messages):
+    handler = rebuild_handler()
+    start = time.perf_counter()
+    for message in messages:
+        rebuilt = handler(message)
+    before = time.perf_counter() - start
+
+    book = OrderBook("BTCUSDT")
+    start = time.perf_counter()
+    data = messages[0]["data"]
+    book.apply_snapshot(data["b"], data["a"], data["u"], data["seq"])
+    for message in messages[1:]:
+        data = message["data"]
+        book.apply_delta(data["b"], data["a"], data["u"], data["seq"])
+    after = time.perf_counter() - start
+
+    for side, book_side in (("b", book.bids), ("a", book.asks)):
+        expected = {float(p): float(v) for p, v in rebuilt["data"][side]}
+        assert dict(book_side.levels()) == expected, f"Books differ on {side=}"
+    return len(messages) / before, len(messages) / after
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    before, after = bench(make_messages(args.deltas, args.depth))
+    print(f"depth              : {args.depth:>12}")
+    print(f"dict rebuild       : {before:>12,.0f} updates/s")
+    print(f"incremental book   : {after:>12,.0f} updates/s")
+    print(f"speedup            : {after / before:>12.2f}x")
@@ -0,0 +1,82 @@
+#!/usr/bin/env python
+"""Lines/second of the offline replay of a raw QUOTES file.
+
+Compares the previous `write_snapshot_file` of `scripts/taq_aggregate`, which
+decoded each line, rebuilt the book dict with `handle_orderbook_delta` and
+wrote it back with `json.dumps`, with `cryptoex.replay.QuoteReplay` writing
+fixed depth snapshots into columnar buffers. Both outputs are checked to
+hold the same best levels, and the frames of the columns to be written to
+and read back from feather files as `scripts/taq_aggregate` does.
+
+Usage: python benchmarks/quotes_replay.py [-n N_DELTAS] [-d DEPTH] [-c CODEC]
+"""
+
+import os
+import json
+import time
+import argparse
+import tempfile
+
+import pandas as pd
+
+from cryptoex.codecs import available_codecs
+from cryptoex.replay import QuoteReplay
+from orderbook_delta import make_messages, rebuild_handler
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-n", "--deltas", type=int, default=100_000)
+parser.add_argument("-d", "--depth", type=int, default=50)
+parser.add_argument(
+    "-c", "--codec", default="auto", choices=("auto", *available_codecs)
+)
+
+
+def write_snapshot_file(handler, quotes_file_path, snapshot_file_path):
+    """`write_snapshot_file` as it was."""
+    with (
+        open(quotes_file_path, "r") as input_file,
+        open(snapshot_file_path, "w") as output_file,
+    ):
+        for line in input_file:
+            output_file.write(json.dumps(handler(json.loads(line))))
+            output_file.write("\n")
+
+
+def bench(quotes_file_path, depth, codec):
+    snapshot_file_path = quotes_file_path.replace(".txt", "-snapshots.txt")
+    start = time.perf_counter()
+    write_snapshot_file(rebuild_handler(), quotes_file_path, snapshot_file_path)
+    before = time.perf_counter() - start
+
+    start = time.perf_counter()
+    columns = QuoteReplay(depth, codec=codec).replay_file(quotes_file_path)
+    after = time.perf_counter() - start
+
+    with open(snapshot_file_path) as file:
+        for i, line in enumerate(file):
+            data = json.loads(line)["data"]
+            # The previous handler kept the levels sent with a size of 0.000
+            best_bid = max(float(p) for p, v in data["b"] if float(v))
+            best_ask = min(float(p) for p, v in data["a"] if float(v))
+            assert columns.side("bid_price")[i, 0] == best_bid, f"Row {i} differs"
+            assert columns.side("ask_price")[i, 0] == best_ask, f"Row {i} differs"
+
+    for frame, name in zip(columns.to_frames(), ("quotes", "meta")):
+        path = quotes_file_path.replace(".txt", f"-{name}.feather")
+        frame.to_feather(path)
+        pd.testing.assert_frame_equal(pd.read_feather(path), frame)
+    return len(columns) / before, len(columns) / after
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    messages = make_messages(args.deltas, args.depth)
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, "BTCUSDT-00-01.txt")
+        with open(path, "w") as file:
+            file.writelines(json.dumps(message) + "\n" for message in messages)
+        before, after = bench(path, args.depth, args.codec)
+    print(f"depth              : {args.depth:>12}")
+    print(f"snapshot file      : {before:>12,.0f} lines/s")
+    print(f"columnar replay    : {after:>12,.0f} lines/s")
+    print(f"speedup            : {after / before:>12.2f}x")
@@ -0,0 +1,135 @@
+#!/usr/bin/env python
+"""Messages/second of the websocket receive path.
+
+Compares the previous receive loop, which created a `recv` task and an
+unsubscription `wait` task for every frame, with the long-lived reader of
+`_WSManager._receive_messages`. Frames are served from memory so only the
+receive path is measured.
+
+Usage: python benchmarks/ws_receive.py [-n N_MESSAGES] [-c CODEC]
+"""
+
+import json
+import time
+import asyncio
+import argparse
+
+from cryptoex._wsmanager import _WSManager
+from cryptoex.codecs import get_codec, available_codecs
+
+parser = argparse.ArgumentParser()
+parser.add_argument("-n", "--messages", type=int, default=200_000)
+parser.add_argument(
+    "-c", "--codec", default="json", choices=("auto", *available_codecs)
+)
+
+TOPIC = "orderbook.50.BTCUSDT"
+ENDPOINT = "/v5/public/linear"
+FRAME = json.dumps(
+    {
+        "topic": TOPIC,
+        "type": "delta",
+        "ts": 1687940967466,
+        "data": {
+            "s": "BTCUSDT",
+            "b": [["30247.20", "30.028"], ["30245.40", "0.224"]],
+            "a": [["30248.70", "0"], ["30249.30", "0.892"]],
+            "u": 177400507,
+            "seq": 66544703342,
+        },
+        "cts": 1687940967464,
+    }
+)
+
+
+class InMemoryWebsocket:
+    """Serves the same frame `n` times, then behaves as a closed connection."""
+
+    def __init__(self, n: int):
+        self._remaining = n
+
+    async def recv(self) -> str:
+        if self._remaining == 0:
+            await asyncio.Future()
+        self._remaining -= 1
+        return FRAME
+
+    def __aiter__(self):
+        return self
+
+    async def __anext__(self) -> str:
+        if self._remaining == 0:
+            raise StopAsyncIteration
+        self._remaining -= 1
+        return FRAME
+
+
+class BenchManager(_WSManager):
+
+    def __init__(self, codec):
+        super().__init__(
+            subdomain="stream",
+            domain="bybit",
+            tl_domain="com",
+            public_endpoint="/v5/public",
+            private_endpoint="/v5/private",
+            trading_endpoint=None,
+            expiry_time=1,
+            requires_auth=False,
+            max_connections=1,
+            save_ssl_keys=False,
+            pcap_dir=None,
+            codec=codec,
+        )
+
+    def _get_reply_id(self, message):
+        return message.get("req_id")
+
+    def _get_message_topic(self, message):
+        return message.get("topic")
+
+
+async def task_pair_loop(websocket, n, callback, codec):
+    """The receive loop as it was: two tasks per frame."""
+    unsub_event = asyncio.Event()
+    for _ in range(n):
+        recv_task = asyncio.Task(websocket.recv())
+        wait_task = asyncio.Task(unsub_event.wait())
+        await asyncio.wait((recv_task, wait_task), return_when=asyncio.FIRST_COMPLETED)
+        wait_task.cancel()
+        callback(codec.loads(recv_task.result()))
+
+
+async def reader_loop(websocket, n, callback, codec):
+    manager = BenchManager(codec)
+    manager._register_subscription(ENDPOINT, TOPIC, callback=callback)
+    await manager._receive_messages(websocket, ENDPOINT)
+
+
+async def bench(loop_function, n, codec):
+    received = 0
+
+    def callback(message):
+        nonlocal received
+        received += 1
+
+    start = time.perf_counter()
+    await loop_function(InMemoryWebsocket(n), n, callback, codec)
+    elapsed = time.perf_counter() - start
+    assert received == n, f"{received=} != {n=}"
+    return n / elapsed
+
+
+async def main(n, codec):
+    codec = get_codec(codec)
+    before = await bench(task_pair_loop, n, codec)
+    after = await bench(reader_loop, n, codec)
+    print(f"codec               : {codec.name:>12}")
+    print(f"task pair per frame : {before:>12,.0f} msg/s")
+    print(f"long-lived reader   : {after:>12,.0f} msg/s")
+    print(f"speedup             : {after / before:>12.2f}x")
+
+
+if __name__ == "__main__":
+    args = parser.parse_args()
+    asyncio.run(main(args.messages, args.codec))
@@ -0,0 +1,137 @@
+import os
+import time
+import hashlib
+import logging
+from collections import OrderedDict
+from typing import Any, Dict, Tuple
+
+from cryptoex.codecs import JSONCodec
+
+_logger = logging.getLogger(__name__)
+
+
+class ResponseCache:
+    """Keeps the responses of REST requests until their time to live expires.
+
+    Entries are evicted in least recently used order once `max_entries` is
+    reached. When `directory` is given, every entry is also written to a file
+    of that directory so that the responses survive a restart: a key missing
+    from memory is looked up on disk before the request is sent. Expiry uses
+    the wall clock to stay valid across processes.
+
+    Parameters
+    ----------
+
+    max_entries: int
+        Maximum number of responses kept in memory.
+
+    directory: str
+        Where responses are persisted, not persisted by default.
+
+    ttls: dict
+        Time to live in seconds by endpoint name, overriding the one set on
+        the endpoint. A time to live of 0 disables the cache of an endpoint.
+
+    codec: JSONCodec
+        Used to write and read the persisted responses.
+    """
+
+    def __init__(
+        self,
+        max_entries: int = 256,
+        directory: str | None = None,
+        ttls: Dict[str, float] | None = None,
+        codec: JSONCodec | None = None,
+    ):
+        self.max_entries = max_entries
+        self.directory = directory
+        self.ttls = ttls or {}
+        self._codec = codec or JSONCodec()
+        self._entries: OrderedDict[str, Tuple[float, Any]] = OrderedDict()
+        self.hits = 0
+        self.misses = 0
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def ttl(self, endpoint: str, default: float | None) -> float | None:
+        """The time to live of the responses of `endpoint`, None if they are
+        not cached.
+        """
+        return self.ttls.get(endpoint, default) or None
+
+    @staticmethod
+    def key(method: str, endpoint: str, params: Dict[str, Any], scope: str) -> str:
+        """Identifies a request. `scope` separates the responses of requests
+        authenticated with different keys.
+        """
+        params = sorted((k, str(v)) for k, v in (params or {}).items())
+        text = f"{method} {endpoint} {scope} {params}"
+        return hashlib.sha256(text.encode()).hexdigest()
+
+    def _path(self, key: str) -> str:
+        return os.path.join(self.directory, f"{key}.json")
+
+    def get(self, key: str) -> Any | None:
+        """The response stored under `key`, None if there is none or it
+        expired.
+        """
+        entry = self._entries.get(key)
+        if entry is None and self.directory:
+            entry = self._load(key)
+        if entry is not None:
+            expires, value = entry
+            if expires > time.time():
+                self._entries[key] = entry
+                self._entries.move_to_end(key)
+                self._evict()
+                self.hits += 1
+                return value
+            self.discard(key)
+        self.misses += 1
+        return None
+
+    def set(self, key: str, value: Any, ttl: float) -> None:
+        expires = time.time() + ttl
+        self._entries[key] = (expires, value)
+        self._entries.move_to_end(key)
+        self._evict()
+        if self.directory:
+            with open(self._path(key), "w") as f:
+                f.write(self._codec.dumps({"expires": expires, "value": value}))
+
+    def discard(self, key: str) -> None:
+        self._entries.pop(key, None)
+        if self.directory:
+            try:
+                os.remove(self._path(key))
+            except FileNotFoundError:
+                pass
+
+    def clear(self) -> None:
+        for key in list(self._entries):
+            self.discard(key)
+        if self.directory:
+            for file in os.listdir(self.directory):
+                if file.endswith(".json"):
+                    self.discard(file[: -len(".json")])
+
+    def _evict(self) -> None:
+        while len(self._entries) > self.max_entries:
+            key, _ = self._entries.popitem(last=False)
+            if self.directory:
+                self.discard(key)
+
+    def _load(self, key: str) -> Tuple[float, Any] | None:
+        try:
+            with open(self._path(key), "rb") as f:
+                entry = self._codec.loads(f.read())
+        except FileNotFoundError:
+            return None
+        except self._codec.decode_errors:
+            _logger.warning(f"Discarding the unreadable cached response {key}")
+            self.discard(key)
+            return None
+        return entry["expires"], entry["value"]
@@ -0,0 +1,336 @@
+"""Delivery of websocket pushes to the callbacks of their topic.
+
+The socket reader hands every push to the `Subscription` of its topic, which
+preprocesses it inline and runs the callback inline, through a bounded queue
+with an overflow policy, as a coroutine, or on a `ShardedExecutor` worker
+off the event loop.
+"""
+
+import os
+import zlib
+import asyncio
+import inspect
+import logging
+from collections import deque
+from concurrent.futures import Future, ProcessPoolExecutor, ThreadPoolExecutor
+from typing import Any, Awaitable, Callable, Dict, List
+
+_logger = logging.getLogger(__name__)
+
+OVERFLOW_POLICIES = ("block", "drop_oldest", "conflate")
+EXECUTOR_KINDS = {"thread": ThreadPoolExecutor, "process": ProcessPoolExecutor}
+
+
+class ShardedExecutor:
+    """Runs callbacks off the event loop on a pool of single worker shards.
+
+    A key (ex. the symbol of a topic) is always mapped to the same shard and
+    every shard has a single worker, so the messages of a key are handled one
+    at a time in the order they were submitted while different keys spread
+    over the workers.
+
+    With processes, the callback and the messages are pickled: the callback
+    must be a module level function (or a partial of one) and its return
+    value is ignored.
+
+    Parameters
+    ----------
+
+    kind: str
+        Either thread or process.
+
+    workers: int
+        Number of shards. Defaults to the number of CPUs.
+    """
+
+    def __init__(self, kind: str = "thread", workers: int | None = None):
+        if kind not in EXECUTOR_KINDS:
+            raise ValueError(
+                f"Unknown executor {kind=}, choose from {', '.join(EXECUTOR_KINDS)}"
+            )
+        self.kind = kind
+        self.workers = workers or os.cpu_count() or 1
+        self._shards: List[Any] = [None] * self.workers
+
+    def shard(self, key: str) -> int:
+        # crc32 rather than hash() so that a key keeps its shard across runs
+        return zlib.crc32(key.encode()) % self.workers
+
+    def submit(self, key: str, fn: Callable, *args) -> Future:
+        index = self.shard(key)
+        executor = self._shards[index]
+        if executor is None:
+            executor = EXECUTOR_KINDS[self.kind](
+                max_workers=1, **self._executor_options(index)
+            )
+            self._shards[index] = executor
+        return executor.submit(fn, *args)
+
+    def _executor_options(self, index: int) -> Dict[str, Any]:
+        if self.kind == "thread":
+            return {"thread_name_prefix": f"cryptoex-shard-{index}"}
+        return {}
+
+    def shutdown(self, wait: bool = True) -> None:
+        for executor in self._shards:
+            if executor is not None:
+                executor.shutdown(wait=wait, cancel_futures=not wait)
+        self._shards = [None] * self.workers
+
+
+class Subscription:
+    """Delivers the pushes of a topic to its callback.
+
+    `preprocess` runs inline in the socket reader, in the order messages are
+    received, and is meant for cheap state maintenance such as applying
+    orderbook deltas. Its result (skipped when None) is handed to `callback`.
+
+    Without `queue_size`, a regular callback runs inline in the reader. With a
+    `queue_size`, messages go through a bounded queue consumed by a task of
+    their own, and the `overflow` policy applies when the queue is full:
+
+        - block: the reader waits for room in the queue (backpressure on the
+          socket).
+        - drop_oldest: the oldest queued message is dropped.
+        - conflate: only the latest message is kept, any pending one is
+          replaced. Meant for snapshots where only the newest matters.
+
+    Coroutine callbacks (`async def`) are always run by the consumer task
+    through a queue (unbounded without `queue_size`). They are awaited one at
+    a time so that the messages of a topic are handled in order, while
+    `limiter` bounds the number of callbacks running at once across
+    subscriptions.
+
+    With an `executor`, a regular callback runs on the worker of the
+    `shard_key` shard instead of the event loop. Without a queue the reader
+    only submits the message, with one the consumer waits for each call to
+    finish, which lets the overflow policy apply when the workers lag.
+
+    Callback errors never stop the delivery: they are counted, logged and
+    passed to `on_error` if given.
+
+    Parameters
+    ----------
+
+    topic: str
+        The topic of the subscription.
+
+    endpoint: str
+        The connection endpoint of the subscription.
+
+    callback: Callable
+        The function to call with each (preprocessed) message.
+
+    preprocess: Callable
+        Function applied to each message in the reader.
+
+    queue_size: int
+        Size of the queue between the reader and the callback.
+
+    overflow: str
+        Policy applied when the queue is full: block, drop_oldest or conflate.
+
+    limiter: asyncio.Semaphore
+        Shared semaphore held while a coroutine callback runs.
+
+    on_error: Callable
+        Function called with the topic and the exception when the callback
+        or the preprocessing fails.
+
+    executor: ShardedExecutor
+        Executor to run the callback on, off the event loop.
+
+    shard_key: str
+        Key used to pick the shard of the executor. Defaults to the topic.
+    """
+
+    def __init__(
+        self,
+        *,
+        topic: str,
+        endpoint: str,
+        callback: Callable,
+        preprocess: Callable | None = None,
+        queue_size: int | None = None,
+        overflow: str = "block",
+        limiter: asyncio.Semaphore | None = None,
+        on_error: Callable | None = None,
+        executor: ShardedExecutor | None = None,
+        shard_key: str | None = None,
+    ):
+        if overflow not in OVERFLOW_POLICIES:
+            raise ValueError(
+                f"Unknown {overflow=}, choose from {', '.join(OVERFLOW_POLICIES)}"
+            )
+        if queue_size is not None and queue_size < 1:
+            raise ValueError(f"{queue_size=} must be a positive integer")
+        if executor is not None and inspect.iscoroutinefunction(callback):
+            raise ValueError("Coroutine callbacks cannot run on an executor")
+
+        self.topic = topic
+        self.endpoint = endpoint
+        self._callback = callback
+        self._preprocess = preprocess
+        self._queue_size = queue_size
+        self._overflow = overflow
+        self._is_async = inspect.iscoroutinefunction(callback)
+        self._queue = deque() if queue_size or self._is_async else None
+        self._limiter = limiter
+        self._on_error = on_error
+        self._executor = executor
+        self._shard_key = shard_key or topic
+        self._not_empty = asyncio.Event()
+        self._not_full = asyncio.Event()
+        self._consumer = None
+        self._closed = False
+
+        self.received = 0
+        self.dropped = 0
+        self.errors = 0
+        self.last_error = None
+        self.in_flight = 0
+
+    def push(self, message: Dict[str, Any]) -> Awaitable | None:
+        """Hands a message received by the reader to the subscription.
+
+        returns
+        -------
+            An awaitable when the reader has to wait for room in the queue,
+            None otherwise.
+        """
+        self.received += 1
+        if self._preprocess is not None:
+            try:
+                message = self._preprocess(message)
+            except Exception as e:
+                self._report(e)
+                return None
+            if message is None:
+                return None
+
+        if self._queue is None:
+            self._run(message)
+            return None
+        return self._enqueue(message)
+
+    def _enqueue(self, message: Any) -> Awaitable | None:
+        if self._closed:
+            self.dropped += 1
+            return None
+        if self._consumer is None:
+            self._consumer = asyncio.create_task(
+                self._consume(), name=f"{self.topic}{self.endpoint}"
+            )
+
+        queue = self._queue
+        if self._overflow == "conflate":
+            if queue:
+                queue[-1] = message
+                self.dropped += 1
+                return None
+        elif self._queue_size and len(queue) >= self._queue_size:
+            if self._overflow == "block":
+                return self._put(message)
+            queue.popleft()
+            self.dropped += 1
+
+        queue.append(message)
+        self._not_empty.set()
+        return None
+
+    async def _put(self, message: Any) -> None:
+        while len(self._queue) >= self._queue_size:
+            if self._closed:
+                # Nothing consumes the queue anymore, the reader must not wait
+                self.dropped += 1
+                return
+            self._not_full.clear()
+            await self._not_full.wait()
+        self._queue.append(message)
+        self._not_empty.set()
+
+    async def _consume(self) -> None:
+        queue = self._queue
+        while True:
+            while not queue:
+                self._not_empty.clear()
+                await self._not_empty.wait()
+            message = queue.popleft()
+            self._not_full.set()
+            if self._is_async:
+                await self._run_async(message)
+            elif self._executor is not None:
+                await asyncio.wait([asyncio.wrap_future(self._submit(message))])
+            else:
+                self._run(message)
+
+    def _run(self, message: Any) -> None:
+        if self._executor is not None:
+            self._submit(message)
+            return
+        try:
+            self._callback(message)
+        except Exception as e:
+            self._report(e)
+
+    def _submit(self, message: Any) -> Future:
+        loop = asyncio.get_running_loop()
+        self.in_flight += 1
+        future = self._executor.submit(self._shard_key, self._callback, message)
+        future.add_done_callback(
+            lambda f: loop.call_soon_threadsafe(self._on_done, f)
+        )
+        return future
+
+    def _on_done(self, future: Future) -> None:
+        self.in_flight -= 1
+        if future.cancelled():
+            return
+        error = future.exception()
+        if error is not None:
+            self._report(error)
+
+    async def _run_async(self, message: Any) -> None:
+        try:
+            if self._limiter is None:
+                await self._callback(message)
+            else:
+                async with self._limiter:
+                    await self._callback(message)
+        except Exception as e:
+            self._report(e)
+
+    def _report(self, error: Exception) -> None:
+        self.errors += 1
+        self.last_error = error
+        _logger.error(
+            f"Callback failed for topic={self.topic} on {self.endpoint}",
+            exc_info=error,
+        )
+        if self._on_error is not None:
+            try:
+                self._on_error(self.topic, error)
+            except Exception as e:
+                _logger.exception(e)
+
+    def close(self) -> None:
+        """Stops the consumer and releases a reader waiting for room in the
+        queue. Messages pushed afterwards are dropped.
+        """
+        self._closed = True
+        self._not_full.set()
+        if self._consumer is not None:
+            self._consumer.cancel()
+            self._consumer = None
+
+    def stats(self) -> Dict[str, Any]:
+        return {
+            "received": self.received,
+            "queue_depth": len(self._queue) if self._queue is not None else 0,
+            "queue_size": self._queue_size,
+            "overflow": self._overflow,
+            "in_flight": self.in_flight,
+            "dropped": self.dropped,
+            "errors": self.errors,
+            "last_error": repr(self.last_error) if self.last_error else None,
+        }
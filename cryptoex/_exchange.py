@@ -1,9 +1,15 @@
 import logging
 
-from typing import Callable, Any, Dict, Tuple
+from typing import AsyncIterator, Callable, Any, Dict, List, Tuple
 
 from cryptoex._wsmanager import _WSManager
 from cryptoex._httpmanager import _HTTPManager
+from cryptoex._ratelimit import RateLimiter
+from cryptoex._cache import ResponseCache
+from cryptoex.codecs import get_codec
+from cryptoex.orderbook import OrderBook
+from cryptoex.ticks import TickScale
+from cryptoex.exchanges.bars import BarBuilder
 from cryptoex.exchanges.utils import ExchangeEndpoints
 from cryptoex.exchanges.utils import ExchangeConfig
 from cryptoex.exchanges.utils import handle_requests
@@ -21,15 +27,34 @@ class Exchange(_HTTPManager, _WSManager):
         config: ExchangeConfig,
         endpoints: ExchangeEndpoints,
         formatter: AbstractFormatter,
+        limits_file: str | None = None,
+        rate_limit: bool = True,
+        response_cache: bool = True,
+        cache_size: int = 256,
+        cache_dir: str | None = None,
+        cache_ttls: Dict[str, float] | None = None,
         expiry_time: int = 1,
         recv_window: int = 5000,
         max_connections: int = 500,
         save_ssl_keys: bool = False,
         pcap_dir: str | None = None,
+        shared_connections: bool = False,
+        json_codec: str = "auto",
+        auto_reconnect: bool = True,
+        max_reconnect_delay: float = 30,
+        heartbeat_interval: float | None = 20,
+        max_concurrent_callbacks: int | None = None,
+        callback_executor: str = "thread",
+        callback_workers: int | None = None,
         **kwargs,
     ):
         assert not (demo and testnet), "Use either testnet or demo not both."
         requires_auth = not testnet
+        codec = get_codec(json_codec)
+        _logger.info(f"Using the {codec.name} codec for {type(self).__name__}")
+        rate_limiter = None
+        if rate_limit and limits_file is not None:
+            rate_limiter = RateLimiter.from_yaml(limits_file, endpoints)
 
         _HTTPManager.__init__(
             self,
@@ -40,6 +65,8 @@ class Exchange(_HTTPManager, _WSManager):
             key=config.key,
             secret=config.secret,
             requires_auth=requires_auth,
+            codec=codec,
+            rate_limiter=rate_limiter,
         )
 
         _WSManager.__init__(
@@ -55,9 +82,25 @@ class Exchange(_HTTPManager, _WSManager):
             max_connections=max_connections,
             save_ssl_keys=save_ssl_keys,
             pcap_dir=pcap_dir,
+            shared_connections=shared_connections,
+            codec=codec,
+            auto_reconnect=auto_reconnect,
+            max_reconnect_delay=max_reconnect_delay,
+            heartbeat_interval=heartbeat_interval,
+            max_concurrent_callbacks=max_concurrent_callbacks,
+            callback_executor=callback_executor,
+            callback_workers=callback_workers,
         )
         self.formatter = formatter
         self.endpoints = endpoints
+        self._response_cache = None
+        if response_cache:
+            self._response_cache = ResponseCache(
+                max_entries=cache_size,
+                directory=cache_dir,
+                ttls=cache_ttls,
+                codec=codec,
+            )
         self.name = type(self).__name__
         self.auto_dump = kwargs.get("auto_dump", not (demo or testnet))
 
@@ -128,7 +171,36 @@ class Exchange(_HTTPManager, _WSManager):
         """
         pass
 
-    @handle_requests(attribute="fees", endpoint="TRADING_FEES", private=True)
+    @handle_requests(
+        attribute="orders",
+        endpoint="ORDER_HISTORY",
+        filename="order_history",
+        private=True,
+    )
+    async def fetch_order_history(self, **kwargs):
+        """Query the history of the orders, newest first.
+
+        Parameters
+        ----------
+
+        kwargs: dict
+            Contains the parameters corresponding to the endpoint.
+        """
+        pass
+
+    def iter_order_history(self, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Yields every page of `fetch_order_history`, prefetching the next
+        page while the current one is processed.
+
+        Parameters
+        ----------
+
+        kwargs: dict
+            Contains the parameters corresponding to the endpoint.
+        """
+        raise NotImplementedError()
+
+    @handle_requests(attribute="fees", endpoint="TRADING_FEES", private=True, ttl=3600)
     async def fetch_trading_fees(self, **kwargs):
         """Fetch trading fees data through REST API
 
@@ -167,6 +239,19 @@ class Exchange(_HTTPManager, _WSManager):
         """
         pass
 
+    def iter_candlesticks(self, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Yields the candlesticks page by page going back in time from `end`
+        (now by default) to `start`, prefetching the next page while the
+        current one is processed.
+
+        Parameters
+        ----------
+
+        kwargs: dict
+            Contains the parameters corresponding to the endpoint.
+        """
+        raise NotImplementedError()
+
     @handle_requests(
         attribute="markets",
         endpoint="ORDERBOOK",
@@ -199,6 +284,7 @@ class Exchange(_HTTPManager, _WSManager):
         attribute="instruments",
         endpoint="INSTRUMENTS",
         level="category",
+        ttl=3600,
     )
     async def fetch_instruments_details(self, **kwargs):
         """Query for the instrument specification of online trading pairs.
@@ -211,8 +297,24 @@ class Exchange(_HTTPManager, _WSManager):
         """
         pass
 
+    def iter_instruments_details(self, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Yields every page of `fetch_instruments_details`, prefetching the
+        next page while the current one is processed.
+
+        Parameters
+        ----------
+
+        kwargs: dict
+            Contains the parameters corresponding to the endpoint.
+        """
+        raise NotImplementedError()
+
     @handle_requests(
-        attribute="markets", endpoint="COINS", filename="coins", private=True
+        attribute="markets",
+        endpoint="COINS",
+        filename="coins",
+        private=True,
+        ttl=3600,
     )
     async def fetch_coin_details(self, **kwargs):
         """Query coin information, including chain information,
@@ -247,6 +349,7 @@ class Exchange(_HTTPManager, _WSManager):
     @handle_requests(
         attribute="announcements",
         endpoint="ANNOUNCEMENTS",
+        ttl=600,
     )
     async def fetch_announcements(self, **kwargs):
         """Get announcements
@@ -262,15 +365,18 @@ class Exchange(_HTTPManager, _WSManager):
     async def get_rate_limits(self, **kwargs):
         """Fetch IP Rate Limits
 
+        Returns the requests per second allowed by endpoint path, and by
+        category when they differ, as loaded from the limits file.
+
         Parameters
         ----------
 
         kwargs: dict
             Contains the parameters corresponding to the endpoint.
         """
-        # TODO: check if a file with limits exist ... if so load the file, otherwise
-        # raise not implemented error
-        raise NotImplementedError()
+        if self._rate_limiter is None:
+            raise NotImplementedError()
+        return self._rate_limiter.limits
 
     # +-------------------+
     # + Websocket methods +
@@ -297,6 +403,13 @@ class Exchange(_HTTPManager, _WSManager):
         depth: int,
         callback: Callable | None = None,
         handle_delta: bool = True,
+        typed: bool = False,
+        arrays: bool = False,
+        ticks: bool = False,
+        shared_memory: bool = False,
+        reclaim_shared_memory: bool = False,
+        analytics_depth: int = 0,
+        max_depth: int | None = None,
         **kwargs,
     ):
         """Subscribes to orderbook stream
@@ -319,6 +432,83 @@ class Exchange(_HTTPManager, _WSManager):
         """
         raise NotImplementedError()
 
+    async def stream_bbo(
+        self,
+        *,
+        category: str,
+        symbol: str,
+        callback: Callable | None = None,
+        depth: int = 1,
+        min_move: float | None = None,
+        ticks: bool = False,
+        **kwargs,
+    ):
+        """Subscribes to the best bid/offer of a symbol, derived from the local
+        orderbook and sent only when it changes.
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbol: spot, linear, inverse, option
+
+        symbol: str
+            The instrument ex: BTCUSDT
+
+        callback: Callable
+            The function to call with a `BBORecord` when the best bid/offer
+            changes.
+
+        depth: int
+            The depth of the orderbook stream the book is built from.
+
+        min_move: float
+            When set, the callback is only called when the best bid or ask
+            price moves by at least this amount (in ticks with `ticks`).
+
+        kwargs: dict
+            Contains extra arguments specific to the exchange.
+        """
+        raise NotImplementedError()
+
+    async def stream_bars(
+        self,
+        *,
+        category: str,
+        symbol: str,
+        bar_sizes: List[int | str],
+        callback: Callable | None = None,
+        partial: bool = False,
+        ticks: bool = False,
+        **kwargs,
+    ):
+        """Subscribes to the trades of a symbol and aggregates them locally into
+        OHLCV bars of several intervals, see `BarBuilder`.
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbol: spot, linear, inverse, option
+
+        symbol: str
+            The instrument ex: BTCUSDT
+
+        bar_sizes: list
+            The intervals of the bars, ex: ['5s', '1m', 15].
+
+        callback: Callable
+            The function to call with the list of `CandleRecord` closed by a
+            message, followed by the running bars with `partial`.
+
+        partial: bool
+            Whether the running bars are also sent after every message.
+
+        kwargs: dict
+            Contains extra arguments specific to the exchange.
+        """
+        raise NotImplementedError()
+
     async def stream_positions(self, *, callback: Callable | None = None, **kwargs):
         """streams position updates
 
@@ -340,6 +530,8 @@ class Exchange(_HTTPManager, _WSManager):
         category: str,
         symbol: str,
         callback: Callable | None = None,
+        typed: bool = False,
+        ticks: bool = False,
         **kwargs,
     ):
         """Subscribes to trade stream
@@ -369,6 +561,7 @@ class Exchange(_HTTPManager, _WSManager):
         symbol: str,
         bar_size: int | str,
         callback: Callable | None = None,
+        typed: bool = False,
         **kwargs,
     ):
         """streams candlesticks updates
@@ -395,6 +588,119 @@ class Exchange(_HTTPManager, _WSManager):
         """
         raise NotImplementedError()
 
+    async def stream_orderbooks(
+        self,
+        *,
+        category: str,
+        symbols: List[str],
+        depth: int,
+        callback: Callable | None = None,
+        handle_delta: bool = True,
+        typed: bool = False,
+        arrays: bool = False,
+        ticks: bool = False,
+        shared_memory: bool = False,
+        reclaim_shared_memory: bool = False,
+        analytics_depth: int = 0,
+        max_depth: int | None = None,
+        **kwargs,
+    ) -> List[str]:
+        """Subscribes to the orderbook streams of several symbols at once
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbols: spot, linear, inverse, option
+
+        symbols: list
+            The instruments ex: [BTCUSDT, ETHUSDT]
+
+        callback: Callable
+            The function to call when new messages are sent by the exchange
+            for any of the symbols.
+
+        kwargs: dict
+            Contains extra arguments specific to the exchange.
+
+        returns
+        -------
+            The topics for which the subscription failed.
+        """
+        raise NotImplementedError()
+
+    async def stream_multiple_trades(
+        self,
+        *,
+        category: str,
+        symbols: List[str],
+        callback: Callable | None = None,
+        typed: bool = False,
+        ticks: bool = False,
+        **kwargs,
+    ) -> List[str]:
+        """Subscribes to the trade streams of several symbols at once
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbols: spot, linear, inverse, option
+
+        symbols: list
+            The instruments ex: [BTCUSDT, ETHUSDT]
+
+        callback: Callable
+            The function to call when new messages are sent by the exchange
+            for any of the symbols.
+
+        kwargs: dict
+            Contains extra arguments specific to the exchange.
+
+        returns
+        -------
+            The topics for which the subscription failed.
+        """
+        raise NotImplementedError()
+
+    async def stream_multiple_candlesticks(
+        self,
+        *,
+        category: str,
+        symbols: List[str],
+        bar_size: int | str,
+        callback: Callable | None = None,
+        typed: bool = False,
+        **kwargs,
+    ) -> List[str]:
+        """Subscribes to the candlesticks streams of several symbols at once
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbols: spot, linear, inverse, option
+
+        symbols: list
+            The instruments ex: [BTCUSDT, ETHUSDT]
+
+        bar_size: int or str
+            The interval that the bar should represent, ex. '1' min or 'D'
+            for 1 day.
+
+        callback: Callable
+            The function to call when new messages are sent by the exchange
+            for any of the symbols.
+
+        kwargs: dict
+            Contains extra arguments specific to the exchange.
+
+        returns
+        -------
+            The topics for which the subscription failed.
+        """
+        raise NotImplementedError()
+
     async def stream_executions(self, *, callback: Callable | None = None, **kwargs):
         """streams executions updates
 
@@ -505,6 +811,53 @@ class Exchange(_HTTPManager, _WSManager):
         """
         raise NotImplementedError()
 
+    async def cancel_stream_bbo(
+        self,
+        *,
+        category: str,
+        symbol: str,
+        depth: int = 1,
+        close_socket: bool = False,
+        **kwargs,
+    ):
+        """Cancels best bid/offer feed
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbol: spot, linear, inverse, option
+
+        symbol: str
+            The instrument ex: BTCUSDT
+
+        depth: int
+            The depth of the orderbook stream the feed is built from.
+
+        kwargs: dict
+            Contains extra arguments specific to the exchange.
+        """
+        raise NotImplementedError()
+
+    async def cancel_stream_bars(
+        self, *, category: str, symbol: str, close_socket: bool = False, **kwargs
+    ):
+        """Cancels bars feed
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbol: spot, linear, inverse, option
+
+        symbol: str
+            The instrument ex: BTCUSDT
+
+        kwargs: dict
+            Contains extra arguments specific to the exchange.
+        """
+        raise NotImplementedError()
+
     async def cancel_stream_candlesticks(
         self,
         *,
@@ -621,7 +974,38 @@ class Exchange(_HTTPManager, _WSManager):
     def _callback_execution_stream(callback, *, message):
         raise NotImplementedError()
 
-    def handle_orderbook_delta(self, message: Dict[str, Any]) -> Dict[str, Any]:
+    def handle_orderbook_delta(
+        self, message: Dict[str, Any], endpoint: str = ""
+    ) -> Dict[str, Any]:
+        raise NotImplementedError()
+
+    def update_orderbook(
+        self, message: Dict[str, Any], endpoint: str = ""
+    ) -> OrderBook | None:
+        raise NotImplementedError()
+
+    def get_resync_metrics(self) -> Dict[str, Dict[str, float]]:
+        raise NotImplementedError()
+
+    def get_orderbook(
+        self, *, symbol: str, depth: int, category: str | None = None
+    ) -> OrderBook | None:
+        raise NotImplementedError()
+
+    def get_orderbook_depths(self) -> Dict[str, Dict[str, int | None]]:
+        raise NotImplementedError()
+
+    def get_bar_builder(
+        self, *, symbol: str, category: str | None = None
+    ) -> BarBuilder | None:
+        raise NotImplementedError()
+
+    async def load_tick_scales(
+        self, *, category: str, symbols: List[str] | None = None
+    ) -> Dict[str, TickScale]:
+        raise NotImplementedError()
+
+    def get_tick_scale(self, *, category: str, symbol: str) -> TickScale | None:
         raise NotImplementedError()
 
     @staticmethod
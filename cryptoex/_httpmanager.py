@@ -1,10 +1,12 @@
-import json
+import asyncio
 import logging
 import httpx
 
-from typing import Dict, Any
+from typing import Dict, Any, Tuple
 from urllib.parse import urlencode
 
+from cryptoex.codecs import JSONCodec
+from cryptoex._ratelimit import RateLimiter
 from cryptoex.exceptions import ExchangeError
 
 _logger = logging.getLogger(__name__)
@@ -12,6 +14,9 @@ _logger = logging.getLogger(__name__)
 
 class _HTTPManager:
 
+    # Error codes of the exchange for which a request is worth retrying
+    _transient_error_codes: frozenset = frozenset()
+
     def __init__(
         self,
         subdomain: str,
@@ -21,6 +26,8 @@ class _HTTPManager:
         key: str,
         secret: str,
         requires_auth: bool = True,
+        codec: JSONCodec | None = None,
+        rate_limiter: RateLimiter | None = None,
     ):
 
         # protected
@@ -28,6 +35,10 @@ class _HTTPManager:
         self._key = key
         self._secret = secret
         self._requires_http_auth = requires_auth
+        self._codec = codec or JSONCodec()
+        self._rate_limiter = rate_limiter
+        self._in_flight: Dict[Tuple[str, ...], asyncio.Task] = {}
+        self.coalesced_requests = 0
 
         # public
         self._recv_window = recv_window
@@ -45,12 +56,26 @@ class _HTTPManager:
             },
         )
 
-    @property
-    def _can_make_request(self):
-        """Attr that checks if there are limits to send orders per second
-        if so we need to override this attribute
+    def get_rate_limit_levels(self) -> Dict[str, Dict[str, float]]:
+        """The tokens available, the rate and the number of waiting requests
+        of the rate limit buckets used so far, see `RateLimiter.levels`.
+        """
+        if self._rate_limiter is None:
+            return {}
+        return self._rate_limiter.levels()
+
+    def is_transient_error(self, error: Exception) -> bool:
+        """Whether a failed request may succeed if sent again: network errors
+        and timeouts, rate limits, server errors (5xx) and the error codes of
+        the exchange in `_transient_error_codes`.
         """
-        return True
+        if isinstance(error, (httpx.TransportError, asyncio.TimeoutError)):
+            return True
+        if not isinstance(error, ExchangeError):
+            return False
+        if error.status is not None:
+            return error.status == 429 or error.status >= 500
+        return error.code in self._transient_error_codes
 
     def _private_headers(self, signature, timestamp, recv_window):
         raise NotImplementedError()
@@ -90,8 +115,48 @@ class _HTTPManager:
             private: bool
                 Whether private headers are needed for authentication
                 to the server.
+
+        Concurrent GET requests with the same endpoint, params and
+        authentication are sent once and their callers get the same result.
         """
+        category = (params or data or {}).get("category")
         params, data = self._request_params(params, data)
+        if method != "GET":
+            return await self._send(method, endpoint, params, data, private, category)
+
+        # Identical concurrent GET requests share one round trip and its result
+        key = (endpoint, params, self._key if private else "")
+        task = self._in_flight.get(key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._send(method, endpoint, params, data, private, category)
+            )
+            self._in_flight[key] = task
+            task.add_done_callback(lambda t: self._request_done(key, t))
+        else:
+            self.coalesced_requests += 1
+            _logger.debug(f"Joining the request in flight to {endpoint}?{params}")
+        # A cancelled caller does not cancel the request of the others
+        return await asyncio.shield(task)
+
+    def _request_done(self, key: Tuple[str, ...], task: asyncio.Task) -> None:
+        if self._in_flight.get(key) is task:
+            del self._in_flight[key]
+        if not task.cancelled():
+            # Marks the exception as retrieved when every caller was cancelled
+            task.exception()
+
+    async def _send(
+        self,
+        method: str,
+        endpoint: str,
+        params: str,
+        data: str | None,
+        private: bool,
+        category: str | None,
+    ) -> Dict[str, Any] | str:
+        if self._rate_limiter is not None:
+            await self._rate_limiter.acquire(endpoint, category)
         client = self._client(private)
         headers = {}
         if private and self._requires_http_auth:
@@ -108,7 +173,8 @@ class _HTTPManager:
         except httpx.HTTPStatusError as error:
             _logger.exception(error)
             raise ExchangeError(
-                f"Unsuccessful API request to {url}: Error {response.status_code}"
+                f"Unsuccessful API request to {url}: Error {response.status_code}",
+                status=response.status_code,
             )
 
         _logger.debug(f"Received {response=} with headers {response.headers}")
@@ -117,8 +183,8 @@ class _HTTPManager:
 
     def _process_response(self, response: httpx.Response) -> Dict[str, Any] | str:
         try:
-            return response.json()
-        except (AttributeError, json.JSONDecodeError):
+            return self._codec.loads(response.content)
+        except (AttributeError, *self._codec.decode_errors):
             return response.text
 
     def _request_params(self, params: Dict[str, Any], data: str) -> str:
@@ -130,5 +196,5 @@ class _HTTPManager:
             params = {k: v for k, v in params.items() if v is not None}
 
         if data:
-            data = json.dumps(data)
+            data = self._codec.dumps(data)
         return urlencode(params or ""), data
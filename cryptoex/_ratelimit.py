@@ -0,0 +1,216 @@
+import os
+import time
+import heapq
+import asyncio
+import itertools
+from typing import Any, Dict, List, Tuple
+
+import yaml
+
+from cryptoex import settings
+
+# Priority of the requests that are not listed in the limits file
+DEFAULT_PRIORITY = 1
+
+
+class TokenBucket:
+    """Allows `rate` requests per second with bursts of up to `capacity`.
+
+    A second can see up to `capacity + rate` requests: a bucket only stays
+    within `rate` in every one second window with the default capacity of 1,
+    which spaces the requests by at least 1 / `rate` seconds.
+
+    Requests that find the bucket empty wait in a queue ordered by priority
+    (lower first), then arrival: a waiting request is never overtaken by a
+    request of the same or a lower priority.
+
+    Parameters
+    ----------
+
+    rate: float
+        Number of tokens added per second.
+
+    capacity: float
+        Maximum number of tokens, at least 1.
+    """
+
+    def __init__(self, rate: float, capacity: float = 1):
+        if rate <= 0:
+            raise ValueError(f"{rate=} must be positive")
+        if capacity < 1:
+            raise ValueError(f"{capacity=} must be at least 1")
+        self.rate = rate
+        self.capacity = capacity
+        self._tokens = self.capacity
+        self._updated = time.monotonic()
+        self._waiters: List[Tuple[int, int, asyncio.Future]] = []
+        self._order = itertools.count()
+        self._timer = None
+
+    def _refill(self) -> None:
+        now = time.monotonic()
+        self._tokens = min(
+            self.capacity, self._tokens + (now - self._updated) * self.rate
+        )
+        self._updated = now
+
+    @property
+    def level(self) -> float:
+        """The number of tokens available."""
+        self._refill()
+        return self._tokens
+
+    @property
+    def waiting(self) -> int:
+        return sum(not future.done() for _, _, future in self._waiters)
+
+    async def acquire(self, priority: int = DEFAULT_PRIORITY) -> None:
+        """Takes a token, waiting for one if needed."""
+        self._refill()
+        waiters = self._waiters
+        # Cancelled requests do not hold the queue
+        while waiters and waiters[0][2].done():
+            heapq.heappop(waiters)
+        if not waiters and self._tokens >= 1:
+            self._tokens -= 1
+            return
+        future = asyncio.get_running_loop().create_future()
+        heapq.heappush(self._waiters, (priority, next(self._order), future))
+        self._schedule()
+        await future
+
+    def _schedule(self) -> None:
+        if self._timer is None:
+            delay = max(0.0, (1 - self._tokens) / self.rate)
+            loop = asyncio.get_running_loop()
+            self._timer = loop.call_later(delay, self._release)
+
+    def _release(self) -> None:
+        self._timer = None
+        self._refill()
+        waiters = self._waiters
+        while waiters and self._tokens >= 1:
+            _, _, future = heapq.heappop(waiters)
+            # Cancelled requests give their turn
+            if not future.done():
+                self._tokens -= 1
+                future.set_result(None)
+        if waiters:
+            self._schedule()
+
+
+class RateLimiter:
+    """Token buckets keyed by endpoint and category.
+
+    Every request takes a token from the bucket of its endpoint (and of its
+    category when the limit of the endpoint differs per category), then from
+    the bucket of the IP when the limits have one. Endpoints without a limit
+    use the `global` one. Requests to the endpoints listed in `priority` are
+    served first when they wait for the same bucket.
+
+    Parameters
+    ----------
+
+    limits: dict
+        Requests per second by endpoint path, either a number or a dict of
+        numbers by category. The `global` and `ip` keys are optional.
+
+    priority: dict
+        Priority by endpoint path, lower is served first.
+    """
+
+    def __init__(
+        self,
+        limits: Dict[str, float | Dict[str, float]],
+        priority: Dict[str, int] | None = None,
+    ):
+        self.limits = limits
+        self.priority = priority or {}
+        self._buckets: Dict[Tuple[str, str | None], TokenBucket] = {}
+        ip_limit = limits.get("ip")
+        self._ip_bucket = TokenBucket(ip_limit) if ip_limit else None
+
+    @classmethod
+    def from_yaml(cls, filename: str, endpoints: Any) -> "RateLimiter":
+        """Loads the `http_limits` and `priority` sections of a file of the
+        mappings directory, where endpoints are named as in `endpoints`.
+        """
+        limits_file = os.path.join(settings.MAPPINGS_DIR, filename)
+        with open(limits_file, "r") as f:
+            config = yaml.safe_load(f)
+
+        limits = {}
+        for name, limit in config["http_limits"].items():
+            if limit is None:
+                continue
+            if name.lower() in ("global", "ip"):
+                limits[name.lower()] = limit
+                continue
+            # Endpoints sharing a path share its most restrictive limit
+            path = getattr(endpoints, name)
+            if path in limits:
+                limit = _min_limit(limits[path], limit)
+            limits[path] = limit
+        priority = {
+            getattr(endpoints, name): level
+            for name, level in (config.get("priority") or {}).items()
+        }
+        return cls(limits, priority)
+
+    def _bucket(self, endpoint: str, category: str | None) -> TokenBucket | None:
+        limit = self.limits.get(endpoint, self.limits.get("global"))
+        if not isinstance(limit, dict):
+            category = None
+        bucket = self._buckets.get((endpoint, category))
+        if bucket is None:
+            if isinstance(limit, dict):
+                # The limits file names the option category options. Requests
+                # without a category or of an unlisted one get the most
+                # restrictive limit
+                limit = (
+                    limit.get(category)
+                    or limit.get(f"{category}s")
+                    or min(limit.values())
+                )
+            if not limit:
+                return None
+            bucket = self._buckets[(endpoint, category)] = TokenBucket(limit)
+        return bucket
+
+    async def acquire(self, endpoint: str, category: str | None = None) -> None:
+        """Waits until a request to `endpoint` for `category` is allowed."""
+        priority = self.priority.get(endpoint, DEFAULT_PRIORITY)
+        bucket = self._bucket(endpoint, category)
+        if bucket is not None:
+            await bucket.acquire(priority)
+        if self._ip_bucket is not None:
+            await self._ip_bucket.acquire(priority)
+
+    def levels(self) -> Dict[str, Dict[str, float]]:
+        """The tokens available, the rate and the number of waiting requests
+        of every bucket used so far, by endpoint and category.
+        """
+        buckets = {
+            (f"{endpoint}:{category}" if category else endpoint): bucket
+            for (endpoint, category), bucket in self._buckets.items()
+        }
+        if self._ip_bucket is not None:
+            buckets["ip"] = self._ip_bucket
+        return {
+            name: {
+                "tokens": bucket.level,
+                "rate": bucket.rate,
+                "waiting": bucket.waiting,
+            }
+            for name, bucket in buckets.items()
+        }
+
+
+def _min_limit(first, second):
+    if isinstance(first, dict) and isinstance(second, dict):
+        return {k: min(first.get(k, v), v) for k, v in (first | second).items()}
+    if isinstance(first, dict):
+        return {k: min(v, second) for k, v in first.items()}
+    if isinstance(second, dict):
+        return _min_limit(second, first)
+    return min(first, second)
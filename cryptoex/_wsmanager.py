@@ -1,26 +1,27 @@
 import os
 import ssl
+import time
+import random
 import logging
-import json
 import asyncio
+import itertools
 import websockets
 from urllib.parse import urljoin
-from typing import Dict, Any, Callable, Tuple
+from typing import Dict, Any, Callable, List, Tuple
 from cryptoex import settings
+from cryptoex.codecs import JSONCodec
+from cryptoex._dispatch import ShardedExecutor, Subscription
+from cryptoex.metrics import RollingHistogram
 from cryptoex.exceptions import ExchangeError, MaxLimitReached, WebsocketError
 
 _logger = logging.getLogger(__name__)
 
 
-class UnsubscribtionEvent(asyncio.Event):
-
-    def __init__(self, close_socket: bool = False, **kwargs):
-        super().__init__(**kwargs)
-        self.close_socket = close_socket
-
-
 class _WSManager:
 
+    # Maximum number of topics sent in a single (un)subscription request
+    _max_topics_per_request = 10
+
     def __init__(
         self,
         subdomain: str,
@@ -34,6 +35,14 @@ class _WSManager:
         max_connections: int,
         save_ssl_keys: bool,
         pcap_dir: str,
+        shared_connections: bool = False,
+        codec: JSONCodec | None = None,
+        auto_reconnect: bool = True,
+        max_reconnect_delay: float = 30,
+        heartbeat_interval: float | None = 20,
+        max_concurrent_callbacks: int | None = None,
+        callback_executor: str = "thread",
+        callback_workers: int | None = None,
     ):
 
         self._ws_base_url = f"wss://{subdomain}.{domain}.{tl_domain}"
@@ -42,10 +51,20 @@ class _WSManager:
             self._trading_endpoint_url = f"{self._ws_base_url}{trading_endpoint}"
 
         # protected
-        self._sub_callbacks = {}
+        self._subscriptions: Dict[str, Subscription] = {}
+        self._sub_kwargs = {}
         self._sub_websockets = {}
+        # Topics of dropped connections waiting to be subscribed again
+        self._reconnecting = set()
         self._available_websockets = {}
-        self._subscription_tasks = {}
+        self._readers = {}
+        self._heartbeats = {}
+        self._latencies: Dict[str, RollingHistogram] = {}
+        self._pending_replies = {}
+        self._req_ids = itertools.count(1)
+        self._reconnect_locks = {}
+        self._reconnect_tasks = set()
+        self._reconnections = {}
         self.public_endpoint = public_endpoint
         self.private_endpoint = private_endpoint
 
@@ -53,8 +72,20 @@ class _WSManager:
         self._requires_ws_auth = requires_auth
         self._expiry_time = expiry_time
         self._max_connections = max_connections
+        self._shared_connections = shared_connections
+        self._codec = codec or JSONCodec()
+        self._auto_reconnect = auto_reconnect
+        self._max_reconnect_delay = max_reconnect_delay
+        self._heartbeat_interval = heartbeat_interval
+        self._callback_limiter = (
+            asyncio.Semaphore(max_concurrent_callbacks)
+            if max_concurrent_callbacks
+            else None
+        )
+        self._callback_executor_kind = callback_executor
+        self._callback_workers = callback_workers
+        self._callback_executor = None
         self._default_context = ssl.create_default_context()
-        self._unsub_event: Dict[str, UnsubscribtionEvent] = {}
         self._name = type(self).__name__
 
         if save_ssl_keys:
@@ -66,7 +97,18 @@ class _WSManager:
 
     @property
     def _can_subscribe(self) -> bool:
-        return len(self._sub_websockets) < self._max_connections
+        websockets_in_use = {id(ws) for ws in self._sub_websockets.values()}
+        if self._shared_connections:
+            websockets_in_use.update(
+                id(ws) for ws in self._available_websockets.values()
+            )
+        return len(websockets_in_use) < self._max_connections
+
+    def _is_subscribed(self, path: str) -> bool:
+        """Whether a topic of an endpoint is subscribed, including while its
+        connection is being recovered.
+        """
+        return path in self._sub_websockets or path in self._reconnecting
 
     async def _subscribe(
         self,
@@ -74,14 +116,23 @@ class _WSManager:
         endpoint: str,
         topic: str,
         callback: Callable | None = None,
+        preprocess: Callable | None = None,
+        queue_size: int | None = None,
+        overflow: str = "block",
+        on_error: Callable | None = None,
+        offload: bool = False,
         **kwargs,
-    ) -> None:
+    ) -> bool:
         """Subscribes to a stream from the exchange
         We ty reusing any available websoket. If none is found we check if we
         can create one. Otherwise we log an error stating that we cannot
         subscibe to the topic. In that case we are using too many connections
         and we should cancel some or wait the quota to be available again.
 
+        In shared connections mode, every topic of an endpoint is carried by
+        the same websocket and a single reader routes each push to its
+        callback using the topic of the message.
+
         Parameters
         ----------
 
@@ -97,25 +148,72 @@ class _WSManager:
         callback: Callable
             The function to call when a push from the server is received.
 
+        preprocess: Callable
+            Function applied to each push inside the reader, before the
+            callback, ex. to maintain a local orderbook.
+
+        queue_size: int
+            When set, pushes are handed to the callback through a bounded
+            queue consumed by a task of its own instead of inline.
+
+        overflow: str
+            Policy applied when the queue is full: block, drop_oldest or
+            conflate. See `Subscription`.
+
+        on_error: Callable
+            Function called with the topic and the exception when the
+            callback fails.
+
+        offload: bool
+            Runs the callback on the callback executor (thread or process
+            pool) instead of the event loop. The topics of a symbol share a
+            worker so their messages are handled in order.
+
+        The callback can be a coroutine function. Its calls are awaited in
+        order for each topic, and at most `max_concurrent_callbacks` run at
+        once across subscriptions.
+
+        The `stream_*` methods of the exchanges accept `queue_size`,
+        `overflow`, `on_error` and `offload` in their keyword arguments and
+        pass them here.
+
         kwargs:
             Keyword arguments to pass to the subscription message function
             to build the subscription payload.
 
-        """
-        #
-        if callback:
-            self._sub_callbacks[topic + endpoint] = callback
+        returns
+        -------
+            Whether the subscription succeeded. A failed subscription is
+            logged and leaves no state behind.
 
+        """
         _logger.info(f"[{self._name}]: Received subscription to {topic}")
 
-        if topic in self._sub_websockets:
+        if self._is_subscribed(topic + endpoint):
             _logger.error(
                 f"[{self._name}]: Cannot subscribe twice to the same {topic=}"
             )
-            return
+            return False
 
-        await self._init_websocket(endpoint)
-        await self._sub_handler(endpoint, topic, **kwargs)
+        if callback:
+            self._register_subscription(
+                endpoint,
+                topic,
+                callback=callback,
+                preprocess=preprocess,
+                queue_size=queue_size,
+                overflow=overflow,
+                on_error=on_error,
+                offload=offload,
+            )
+
+        self._sub_kwargs[topic + endpoint] = kwargs
+        try:
+            await self._init_websocket(endpoint)
+        except Exception:
+            self._clean_data(topic + endpoint)
+            raise
+        return await self._sub_handler(endpoint, topic, **kwargs)
 
     async def _init_websocket(self, endpoint: str) -> None:
         ws = self._available_websockets.get(endpoint)
@@ -179,138 +277,533 @@ class _WSManager:
             function to build the unsubscription payload.
 
         """
-        if topic + endpoint in self._unsub_event:
-            self._unsub_event[topic + endpoint].close_socket = close_socket
-            self._unsub_event[topic + endpoint].set()
-            await asyncio.sleep(0)
+        if self._drop_reconnecting(endpoint, [topic]):
+            await self._send_unsubscription(endpoint, [topic], close_socket, **kwargs)
+
+    async def _subscribe_many(
+        self,
+        *,
+        endpoint: str,
+        topics: List[str],
+        callback: Callable | None = None,
+        preprocess: Callable | None = None,
+        queue_size: int | None = None,
+        overflow: str = "block",
+        on_error: Callable | None = None,
+        offload: bool = False,
+        **kwargs,
+    ) -> List[str]:
+        """Subscribes to several topics of the same endpoint at once.
+
+        Topics are sent in chunks of `_max_topics_per_request` per subscription
+        request and all the replies are awaited concurrently. Every topic of a
+        chunk is carried by the same websocket.
+
+        Parameters
+        ----------
+
+        endpoint: str
+            The connection endpoint, see `_subscribe`.
+
+        topics: list
+            The topics to receive updates from the exchange.
+
+        callback: Callable
+            The function to call when a push of any of the topics is received.
+            Each topic gets its own queue and statistics.
+
+        preprocess, queue_size, overflow, on_error, offload:
+            See `_subscribe`.
+
+        kwargs:
+            Keyword arguments to pass to the subscription message function
+            to build the subscription payload.
+
+        returns
+        -------
+            The topics for which the subscription failed.
+        """
+        new_topics = []
+        for topic in dict.fromkeys(topics):
+            if self._is_subscribed(topic + endpoint):
+                _logger.error(
+                    f"[{self._name}]: Cannot subscribe twice to the same {topic=}"
+                )
+                continue
+            if callback:
+                self._register_subscription(
+                    endpoint,
+                    topic,
+                    callback=callback,
+                    preprocess=preprocess,
+                    queue_size=queue_size,
+                    overflow=overflow,
+                    on_error=on_error,
+                    offload=offload,
+                )
+            self._sub_kwargs[topic + endpoint] = kwargs
+            new_topics.append(topic)
+
+        _logger.info(
+            f"[{self._name}]: Received subscription to {len(new_topics)} topics"
+        )
+        try:
+            failed = await self._send_subscriptions(endpoint, new_topics, **kwargs)
+        except Exception:
+            for topic in new_topics:
+                self._clean_data(topic + endpoint)
+            raise
+        for topic in failed:
+            self._clean_data(topic + endpoint)
+        return failed
+
+    async def _send_subscriptions(
+        self, endpoint: str, topics: List[str], **kwargs
+    ) -> List[str]:
+        """Sends the subscription requests of topics in chunks of
+        `_max_topics_per_request` and awaits the replies concurrently. The
+        topics of a failed chunk are released from their websocket, the rest
+        of their state is left to the caller.
+
+        returns
+        -------
+            The topics for which the subscription failed.
+        """
+        size = self._max_topics_per_request
+        chunks = [topics[i : i + size] for i in range(0, len(topics), size)]
+        requests = []
+        websockets_used = []
+        for chunk in chunks:
+            await self._init_websocket(endpoint)
+            websocket = self._assign_websocket(endpoint, chunk)
+            websockets_used.append(websocket)
+            requests.append(
+                self._send_subscription(websocket, endpoint, chunk, **kwargs)
+            )
+
+        failed = []
+        results = await asyncio.gather(*requests, return_exceptions=True)
+        for chunk, websocket, result in zip(chunks, websockets_used, results):
+            if isinstance(result, Exception):
+                _logger.error(f"[{self._name}]: Cleaning up for {chunk}")
+                _logger.exception(result)
+                for topic in chunk:
+                    self._sub_websockets.pop(topic + endpoint, None)
+                await self._release_websocket(endpoint, websocket)
+                failed.extend(chunk)
+        return failed
+
+    async def _unsubscribe_many(
+        self,
+        *,
+        endpoint: str,
+        topics: List[str],
+        close_socket: bool,
+        **kwargs,
+    ) -> None:
+        """Unsubscribes from several topics of the same endpoint at once.
+
+        Topics are grouped by websocket and sent in chunks of
+        `_max_topics_per_request`. The replies are awaited concurrently.
+        """
+        groups = {}
+        for topic in self._drop_reconnecting(endpoint, list(dict.fromkeys(topics))):
+            websocket = self._sub_websockets.get(topic + endpoint)
+            if websocket is None:
+                raise WebsocketError(f"No subscription for {topic=} and {endpoint=}")
+            groups.setdefault(id(websocket), []).append(topic)
+
+        size = self._max_topics_per_request
+        await asyncio.gather(
+            *(
+                self._send_unsubscription(
+                    endpoint, group[i : i + size], close_socket, **kwargs
+                )
+                for group in groups.values()
+                for i in range(0, len(group), size)
+            )
+        )
+
+    def _drop_reconnecting(self, endpoint: str, topics: List[str]) -> List[str]:
+        """Forgets the topics waiting for their dropped connection to be
+        recovered: there is nothing to send to the exchange and the
+        reconnection supervisor skips them.
+
+        returns
+        -------
+            The other topics.
+        """
+        remaining = []
+        for topic in topics:
+            path = topic + endpoint
+            if path in self._reconnecting and path not in self._sub_websockets:
+                _logger.info(f"[{self._name}]: Dropped {topic=} while reconnecting")
+                self._clean_data(path)
+            else:
+                remaining.append(topic)
+        return remaining
+
+    def _register_subscription(
+        self, endpoint: str, topic: str, offload: bool = False, **options
+    ) -> None:
+        subscription = self._subscriptions.pop(topic + endpoint, None)
+        if subscription is not None:
+            subscription.close()
+        if offload:
+            if self._callback_executor is None:
+                self._callback_executor = ShardedExecutor(
+                    self._callback_executor_kind, self._callback_workers
+                )
+            options["executor"] = self._callback_executor
+            options["shard_key"] = self._get_topic_symbol(topic)
+        self._subscriptions[topic + endpoint] = Subscription(
+            topic=topic, endpoint=endpoint, limiter=self._callback_limiter, **options
+        )
+
+    def shutdown_callback_executor(self, wait: bool = True) -> None:
+        """Stops the workers running the offloaded callbacks. Pending calls
+        are cancelled unless `wait` is True.
+        """
+        if self._callback_executor is not None:
+            self._callback_executor.shutdown(wait=wait)
+
+    def _assign_websocket(
+        self, endpoint: str, topics: List[str]
+    ) -> websockets.ClientConnection:
+        # Since a call to init_websocket has been made, we are guaranteed to have
+        # a websocket available. Shared websockets stay available for the next
+        # topics of the same endpoint.
+        if self._shared_connections:
+            websocket = self._available_websockets[endpoint]
         else:
-            raise WebsocketError(f"No subscription for {topic=} and {endpoint=}")
+            websocket = self._available_websockets.pop(endpoint)
+        for topic in topics:
+            self._sub_websockets[topic + endpoint] = websocket
+        return websocket
 
     async def _sub_handler(
         self,
         endpoint: str,
         topic: str,
         **kwargs,
-    ):
-        # Since a call to init_websocket has been made, we are guaranteed to have
-        # a websocket available
-        websocket = self._available_websockets.pop(endpoint)
-        self._sub_websockets[topic + endpoint] = websocket
-
+    ) -> bool:
+        websocket = self._assign_websocket(endpoint, [topic])
         try:
-            await self._send_subscription(websocket, endpoint, topic, **kwargs)
+            await self._send_subscription(websocket, endpoint, [topic], **kwargs)
 
         except Exception as e:
             _logger.debug(f"[{self._name}]: Cleaning up for {topic}")
             _logger.exception(e)
-            self._clean_data(topic)
+            self._clean_data(topic + endpoint)
+            await self._release_websocket(endpoint, websocket)
+            return False
+        return True
 
     async def _send_subscription(
         self,
         websocket: websockets.ClientConnection,
         endpoint: str,
-        topic: str,
+        topics: List[str],
         **kwargs,
     ) -> None:
-        # Subscribe to topic
-        message = self._generate_subscription_message(topic, **kwargs)
-        _logger.debug(f"[{self._name}]: Generated subscription {message=}")
-        path = topic + endpoint
-        await websocket.send(message)
-        message = json.loads(await websocket.recv())
+        self._start_reader(websocket, endpoint)
+        message = await self._request_reply(
+            websocket, self._generate_subscription_message, topics, **kwargs
+        )
         success, error = self._get_reply_status(message)
         if success:
-            _logger.info(f"[{self._name}]: Subscription to {topic=} successful")
-            self._unsub_event[path] = UnsubscribtionEvent()
-            self._subscription_tasks[path] = asyncio.create_task(
-                self._receive_messages(websocket, endpoint, topic, **kwargs), name=path
-            )
+            _logger.info(f"[{self._name}]: Subscription to {topics=} successful")
         else:
             _logger.error(
-                f"[{self._name}]: Subscription to {topic=} failed with {error=}"
+                f"[{self._name}]: Subscription to {topics=} failed with {error=}"
             )
-            raise ExchangeError(f"Unable to subscribe to {topic=}, {error!s}")
+            raise ExchangeError(f"Unable to subscribe to {topics=}, {error!s}")
 
-    async def _receive_messages(
+    async def _send_unsubscription(
+        self, endpoint: str, topics: List[str], close_socket: bool, **kwargs
+    ) -> None:
+        paths = [topic + endpoint for topic in topics]
+        for topic, path in zip(topics, paths):
+            if path not in self._sub_websockets:
+                raise WebsocketError(f"No subscription for {topic=} and {endpoint=}")
+
+        websocket = self._sub_websockets[paths[0]]
+        message = await self._request_reply(
+            websocket, self._generate_unsubscription_message, topics, **kwargs
+        )
+        success, reason = self._get_reply_status(message)
+        if not success:
+            raise ExchangeError(f"Unable to unsubscribe from {topics}, {reason=}")
+
+        _logger.info(f"[{self._name}]: Unsubscription from {topics=} successful.")
+        for path in paths:
+            self._clean_data(path)
+        await self._release_websocket(endpoint, websocket, close_socket)
+
+    async def _release_websocket(
         self,
-        websocket: websockets.ClientConnection,
         endpoint: str,
-        topic: str,
-        **kwargs,
+        websocket: websockets.ClientConnection,
+        close_socket: bool = False,
     ) -> None:
-        path = topic + endpoint
-        try:
-            while True:
-                recv_task = asyncio.Task(websocket.recv())
-                wait_task = asyncio.Task(self._unsub_event[path].wait())
-                tasks = (recv_task, wait_task)
-                await asyncio.wait(tasks, return_when=asyncio.FIRST_COMPLETED)
-
-                if self._unsub_event[path].is_set():
-                    _logger.info(
-                        f"[{self._name}]:"
-                        f" Unsubscription event triggered for {topic}"
-                    )
-                    recv_task.cancel()
-                    await asyncio.sleep(0)
-                    close_socket = self._unsub_event[path].close_socket
-                    await asyncio.wait_for(
-                        self._send_unsubscription(
-                            endpoint, topic, close_socket, **kwargs
-                        ),
-                        timeout=1,
-                    )
-                    self._unsub_event.pop(path)
-                    break
-
-                message = json.loads(recv_task.result())
-                _logger.debug(f"[{self._name}]: Received {message=}")
-                if path in self._sub_callbacks:
-                    self._sub_callbacks[path](message)
+        """Makes a websocket that no longer carries any topic available to the
+        next subscriptions of its endpoint, or closes it if `close_socket` or
+        if the endpoint already has an available websocket.
+        """
+        if any(ws is websocket for ws in self._sub_websockets.values()):
+            return
 
-        except asyncio.CancelledError:
-            _logger.debug(f"[{self._name}]: Cleaning up for {topic}")
+        available = self._available_websockets.get(endpoint)
+        if available is websocket:
+            if close_socket:
+                self._available_websockets.pop(endpoint)
+                await websocket.close()
+        elif available is not None or close_socket:
             await websocket.close()
-            self._clean_data(path)
-            _logger.debug(
-                f"[{self._name}]: Unsubscription to {topic} has been cancelled"
+        else:
+            self._available_websockets[endpoint] = websocket
+
+    async def _request_reply(
+        self,
+        websocket: websockets.ClientConnection,
+        generate_message: Callable,
+        *args,
+        **kwargs,
+    ) -> Dict[str, Any]:
+        """Sends a request on a websocket that is consumed by a reader task and
+        waits for the reply carrying the same request id. The request id is
+        passed to `generate_message` as the `req_id` keyword argument.
+        """
+        req_id = str(next(self._req_ids))
+        future = asyncio.get_running_loop().create_future()
+        self._pending_replies[req_id] = (websocket, future)
+        message = generate_message(*args, req_id=req_id, **kwargs)
+        _logger.debug(f"[{self._name}]: Generated request {message=}")
+        try:
+            await websocket.send(message)
+            return await asyncio.wait_for(future, timeout=10)
+        finally:
+            self._pending_replies.pop(req_id, None)
+
+    def _start_reader(self, websocket: websockets.ClientConnection, endpoint: str):
+        reader = self._readers.get(id(websocket))
+        if reader is None or reader.done():
+            self._readers[id(websocket)] = asyncio.create_task(
+                self._receive_messages(websocket, endpoint), name=endpoint
             )
-        except TimeoutError:
-            _logger(f"[{self._name}]: Timeout - Unable to unsbscribe from {topic}.")
-            websocket.close()
+            if self._heartbeat_interval:
+                self._heartbeats[id(websocket)] = asyncio.create_task(
+                    self._heartbeat(websocket, endpoint), name=f"{endpoint}-heartbeat"
+                )
+
+    async def _heartbeat(
+        self, websocket: websockets.ClientConnection, endpoint: str
+    ) -> None:
+        """Sends the exchange ping every `heartbeat_interval` seconds and records
+        the round-trip time of the pong. A missing pong closes the connection
+        so that its topics are recovered.
+        """
+        latencies = self._latencies.setdefault(endpoint, RollingHistogram())
+        while True:
+            await asyncio.sleep(self._heartbeat_interval)
+            start = time.perf_counter()
+            try:
+                await self._request_reply(websocket, self._generate_ping_message)
+            except TimeoutError:
+                _logger.warning(f"[{self._name}]: No pong received for {endpoint=}")
+                await websocket.close()
+                return
+            except (WebsocketError, websockets.ConnectionClosed):
+                return
+            latencies.add(time.perf_counter() - start)
+
+    async def _receive_messages(
+        self, websocket: websockets.ClientConnection, endpoint: str
+    ) -> None:
+        """Single long-lived reader of a websocket. Replies to requests are handed
+        to the waiting coroutine, pushes are routed to the callback of their topic.
+        The reader ends when the connection is closed.
+        """
+        try:
+            async for raw_message in websocket:
+                message = self._codec.loads(raw_message)
+                if _logger.isEnabledFor(logging.DEBUG):
+                    _logger.debug(f"[{self._name}]: Received {message=}")
+
+                req_id = self._get_reply_id(message)
+                if req_id in self._pending_replies:
+                    _, future = self._pending_replies.pop(req_id)
+                    if not future.done():
+                        future.set_result(message)
+                    continue
+
+                path = f"{self._get_message_topic(message)}{endpoint}"
+                subscription = self._subscriptions.get(path)
+                if subscription is None:
+                    continue
+                waiter = subscription.push(message)
+                if waiter is not None:
+                    await waiter
+        except websockets.ConnectionClosed as e:
+            _logger.warning(f"[{self._name}]: Connection closed for {endpoint=}: {e}")
         except Exception as e:
+            _logger.error(f"[{self._name}]: Reader failed for {endpoint=}")
             _logger.exception(e)
+            await websocket.close()
+        finally:
+            self._readers.pop(id(websocket), None)
+            heartbeat = self._heartbeats.pop(id(websocket), None)
+            if heartbeat is not None:
+                heartbeat.cancel()
+            for req_id, (ws, future) in list(self._pending_replies.items()):
+                if ws is websocket and not future.done():
+                    future.set_exception(
+                        WebsocketError(f"Connection closed for {endpoint=}")
+                    )
 
-    async def _send_unsubscription(
-        self, endpoint: str, topic: str, close_socket: bool, **kwargs
+        # Topics still assigned to the socket were not unsubscribed: the
+        # connection dropped.
+        topics = [
+            path[: -len(endpoint)]
+            for path, ws in self._sub_websockets.items()
+            if ws is websocket
+        ]
+        if self._available_websockets.get(endpoint) is websocket:
+            self._available_websockets.pop(endpoint)
+        if topics and self._auto_reconnect:
+            task = asyncio.create_task(self._reconnect(endpoint, websocket, topics))
+            self._reconnect_tasks.add(task)
+            task.add_done_callback(self._reconnect_tasks.discard)
+
+    async def _reconnect(
+        self,
+        endpoint: str,
+        websocket: websockets.ClientConnection,
+        topics: List[str],
     ) -> None:
-        path = topic + endpoint
-        websocket = self._sub_websockets[path]
-        message = self._generate_unsubscription_message(topic, **kwargs)
-        _logger.debug(f"[{self._name}]: Generated unsubscription {message=}")
+        """Supervises the recovery of the topics of a dropped connection.
 
-        await websocket.send(message)
-        # Discard non unsubscription messages for this socket
+        A new connection is opened with a jittered exponential backoff (and
+        authenticated for private endpoints), then every topic is subscribed
+        again in bulk. Cached state derived from the topics is invalidated so
+        that the next snapshot reseeds it.
+        """
+        start = time.monotonic()
+        _logger.warning(
+            f"[{self._name}]: Reconnecting {len(topics)} topics for {endpoint=}"
+        )
+        for topic in topics:
+            if self._sub_websockets.get(topic + endpoint) is websocket:
+                self._sub_websockets.pop(topic + endpoint)
+            self._reconnecting.add(topic + endpoint)
+        self._invalidate_topics(endpoint, topics)
+
+        lock = self._reconnect_locks.setdefault(endpoint, asyncio.Lock())
+        metrics = self._reconnections.setdefault(
+            endpoint,
+            {
+                "reconnections": 0,
+                "failed_attempts": 0,
+                "last_recovery_time": 0.0,
+                "max_recovery_time": 0.0,
+            },
+        )
+        attempt = 0
         while True:
-            message = json.loads(await websocket.recv())
-            _logger.debug(
-                f"[{self._name}]: Received unsubscription response: {message}"
-            )
             try:
-                success, reason = self._get_reply_status(message)
+                async with lock:
+                    # Unsubscribed while we were waiting
+                    reconnecting = self._reconnecting
+                    topics = [t for t in topics if t + endpoint in reconnecting]
+                    if not topics:
+                        return
+                    await self._init_websocket(endpoint)
+                    failed = await self._resubscribe(endpoint, topics)
+                    self._reconnecting.difference_update(
+                        t + endpoint for t in topics if t not in failed
+                    )
+                    topics = failed
+            except Exception as e:
+                _logger.error(f"[{self._name}]: Reconnection failed for {endpoint=}")
+                _logger.exception(e)
+
+            if not topics:
                 break
-            except KeyError:
-                pass
 
-        if success:
-            _logger.info(f"[{self._name}]: Unsubscription from {topic=} successful.")
-            ws = self._sub_websockets.pop(path)
-            if endpoint in self._available_websockets or close_socket:
-                await ws.close()
-            else:
-                self._available_websockets[endpoint] = ws
-        else:
-            raise ExchangeError(f"Unable to unsubscribe from {topic}, {reason=}")
+            metrics["failed_attempts"] += 1
+            delay = min(self._max_reconnect_delay, 0.5 * 2**attempt)
+            attempt += 1
+            await asyncio.sleep(random.uniform(delay / 2, delay))
+
+        recovery_time = time.monotonic() - start
+        metrics["reconnections"] += 1
+        metrics["last_recovery_time"] = recovery_time
+        metrics["max_recovery_time"] = max(metrics["max_recovery_time"], recovery_time)
+        _logger.warning(
+            f"[{self._name}]: Recovered {endpoint=} in {recovery_time:.3f}s"
+        )
+
+    async def _resubscribe(self, endpoint: str, topics: List[str]) -> List[str]:
+        """Subscribes again to topics keeping their callbacks. Topics are sent in
+        bulk, grouped by their subscription arguments. The callbacks of the
+        topics that fail are kept for the next attempt.
+
+        returns
+        -------
+            The topics for which the subscription failed.
+        """
+        groups = {}
+        for topic in topics:
+            kwargs = self._sub_kwargs[topic + endpoint]
+            # The arguments can hold unhashable values
+            key = repr(sorted(kwargs.items()))
+            groups.setdefault(key, (kwargs, []))[1].append(topic)
+
+        failed = []
+        for kwargs, group in groups.values():
+            failed.extend(await self._send_subscriptions(endpoint, group, **kwargs))
+        return failed
+
+    def get_subscription_stats(self) -> Dict[str, Dict[str, Dict[str, Any]]]:
+        """Statistics of every subscription, per endpoint and topic: received
+        messages, queue depth, dropped messages and callback errors.
+        """
+        stats = {}
+        for subscription in self._subscriptions.values():
+            stats.setdefault(subscription.endpoint, {})[
+                subscription.topic
+            ] = subscription.stats()
+        return stats
+
+    def get_reconnection_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Reconnection metrics per endpoint: number of recoveries, failed
+        attempts and the last and maximum recovery times in seconds.
+        """
+        return {k: dict(v) for k, v in self._reconnections.items()}
+
+    def get_latency_stats(self) -> Dict[str, Dict[str, Any]]:
+        """Heartbeat round-trip times per endpoint in seconds: count, last, min,
+        mean, p50, p90, p99, max and a histogram of the rolling window.
+        """
+        return {k: v.summary() for k, v in self._latencies.items()}
+
+    def fastest_endpoint(self, endpoints: List[str] | None = None) -> str | None:
+        """Returns the endpoint with the lowest median round-trip time among
+        `endpoints` (all the measured endpoints by default).
+        """
+        candidates = [
+            (latencies.quantile(0.5), endpoint)
+            for endpoint, latencies in self._latencies.items()
+            if len(latencies) and (endpoints is None or endpoint in endpoints)
+        ]
+        return min(candidates)[1] if candidates else None
+
+    def _invalidate_topics(self, endpoint: str, topics: List[str]) -> None:
+        """Drops any local state built from the messages of the topics of an
+        endpoint.
+        Called before the topics are subscribed again after a disconnection.
+        """
+        pass
 
     async def prepare_public_websocket(self, path: str | None = None) -> str:
         """Prepare a public websocket. Only needed if the intention is to retrieve
@@ -356,13 +849,16 @@ class _WSManager:
     def _clean_data(self, path: str) -> None:
         if path in self._sub_websockets:
             self._sub_websockets.pop(path)
-        if path in self._unsub_event:
-            self._unsub_event.pop(path)
+        self._reconnecting.discard(path)
+        subscription = self._subscriptions.pop(path, None)
+        if subscription is not None:
+            subscription.close()
+        self._sub_kwargs.pop(path, None)
 
     async def _authenticate(self, websocket: websockets.ClientConnection) -> None:
         message = self._generate_ws_authentication_message()
         await websocket.send(message)
-        message = json.loads(await websocket.recv())
+        message = self._codec.loads(await websocket.recv())
         success, error = self._get_reply_status(message)
 
         _logger.debug(
@@ -372,15 +868,32 @@ class _WSManager:
         if not success:
             raise ExchangeError(f"Unable to authenticate, {error=}")
 
-    def _generate_unsubscription_message(self, topic: str, **kwargs) -> str:
+    def _generate_unsubscription_message(self, topics: List[str], **kwargs) -> str:
         raise NotImplementedError("This method needs to be implemented")
 
-    def _generate_subscription_message(self, topic: str, **kwargs) -> str:
+    def _generate_subscription_message(self, topics: List[str], **kwargs) -> str:
         raise NotImplementedError("This method needs to be implemented")
 
     def _generate_ws_authentication_message(self) -> str:
         raise NotImplementedError("This method needs to be implemented")
 
+    def _generate_ping_message(self, **kwargs) -> str:
+        raise NotImplementedError("This method needs to be implemented")
+
+    def _get_reply_id(self, message: Dict[str, Any]) -> str | None:
+        """Returns the request id echoed by the server in a reply, if any."""
+        raise NotImplementedError("This method needs to be implemented")
+
+    def _get_message_topic(self, message: Dict[str, Any]) -> str | None:
+        """Returns the topic a pushed message belongs to."""
+        raise NotImplementedError("This method needs to be implemented")
+
+    def _get_topic_symbol(self, topic: str) -> str:
+        """Returns the symbol of a topic, used to shard offloaded callbacks.
+        Defaults to the topic itself.
+        """
+        return topic
+
     def _get_reply_status(self, message: Dict[str, Any]) -> Tuple[bool, str]:
         """Processes the server reply to an subscription
         Used to tell whether the subscription is successful or not.
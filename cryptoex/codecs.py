@@ -0,0 +1,90 @@
+"""JSON codecs used to encode requests and decode exchange replies.
+
+The standard library codec is always available. Faster codecs are used when
+their package is installed: orjson or msgspec.
+"""
+
+import json
+
+try:
+    import orjson
+except ImportError:
+    orjson = None
+
+try:
+    import msgspec
+except ImportError:
+    msgspec = None
+
+
+class JSONCodec:
+    """Standard library codec.
+
+    `loads` accepts str or bytes, `dumps` always returns a str so that the
+    result can be sent as a websocket text frame or as an HTTP body.
+    `decode_errors` holds the exceptions raised by `loads` on invalid input,
+    to be used in `except` clauses.
+    """
+
+    name = "json"
+    decode_errors = (ValueError,)
+
+    def __init__(self):
+        self.loads = json.loads
+        self.dumps = json.dumps
+
+
+class OrjsonCodec(JSONCodec):
+
+    name = "orjson"
+
+    def __init__(self):
+        if orjson is None:
+            raise ImportError("orjson is not installed")
+        dumps = orjson.dumps
+        self.loads = orjson.loads
+        self.dumps = lambda obj: dumps(obj).decode()
+
+
+class MsgspecCodec(JSONCodec):
+
+    name = "msgspec"
+
+    def __init__(self):
+        if msgspec is None:
+            raise ImportError("msgspec is not installed")
+        encode = msgspec.json.Encoder().encode
+        self.loads = msgspec.json.Decoder().decode
+        self.dumps = lambda obj: encode(obj).decode()
+        # DecodeError is not a ValueError
+        self.decode_errors = (ValueError, msgspec.DecodeError)
+
+
+# Ordered from the fastest to the slowest
+available_codecs = {
+    codec.name: codec for codec in (OrjsonCodec, MsgspecCodec, JSONCodec)
+}
+
+
+def get_codec(name: str = "auto") -> JSONCodec:
+    """Returns a codec instance.
+
+    Parameters
+    ----------
+
+    name: str
+        One of `auto`, `orjson`, `msgspec` or `json`. `auto` picks the
+        fastest codec that is installed.
+    """
+    if name == "auto":
+        for codec in available_codecs.values():
+            try:
+                return codec()
+            except ImportError:
+                continue
+
+    if name not in available_codecs:
+        raise ValueError(
+            f"Unknown codec {name=}, choose from auto, {', '.join(available_codecs)}"
+        )
+    return available_codecs[name]()
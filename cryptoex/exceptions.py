@@ -1,5 +1,12 @@
 class ExchangeError(Exception):
-    pass
+    """`status` is the HTTP status of a failed request and `code` the error
+    code returned by the exchange, when known.
+    """
+
+    def __init__(self, *args, status: int | None = None, code: int | None = None):
+        super().__init__(*args)
+        self.status = status
+        self.code = code
 
 
 class WebsocketError(Exception):
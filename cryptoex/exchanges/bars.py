@@ -0,0 +1,205 @@
+"""OHLCV bars aggregated locally from the trade feed.
+
+A single trade subscription is enough to build bars of several intervals,
+including sub-minute ones that kline streams do not offer. Bars are aligned
+on the epoch (weeks start on monday as for Bybit) and emitted as
+`CandleRecord`s: `confirmed` is True for a closed bar and False for a
+running partial one.
+"""
+
+from typing import Any, Dict, Iterable, List, Tuple
+
+from cryptoex.ticks import TickScale
+from cryptoex.exchanges.records import CandleRecord
+
+_UNITS = {"ms": 1, "s": 1_000, "m": 60_000, "h": 3_600_000, "d": 86_400_000}
+_LETTERS = {"D": 86_400_000, "W": 7 * 86_400_000}
+# 1970-01-05, the first monday after the epoch
+_WEEK_OFFSET = 4 * 86_400_000
+
+
+def interval_ms(bar_size: int | str) -> int:
+    """Length of a bar in milliseconds.
+
+    Integers and numeric strings are minutes as for the kline streams, ex. 1
+    or '60'. D and W are a day and a week. Other strings are a number and a
+    unit among ms, s, m, h and d, ex. '250ms', '5s', '15m' or '4h'. Months
+    have no fixed length and are not supported.
+    """
+    text = str(bar_size).strip()
+    if text in _LETTERS:
+        return _LETTERS[text]
+    if text.isdigit():
+        length = int(text) * _UNITS["m"]
+    else:
+        number = text.rstrip("abcdefghijklmnopqrstuvwxyz")
+        unit = text[len(number) :]
+        if unit not in _UNITS or not number.isdigit():
+            raise ValueError(f"Invalid {bar_size=}")
+        length = int(number) * _UNITS[unit]
+    if length <= 0:
+        raise ValueError(f"Invalid {bar_size=}")
+    return length
+
+
+class _Bar:
+    __slots__ = (
+        "start",
+        "end",
+        "open",
+        "high",
+        "low",
+        "close",
+        "volume",
+        "turnover",
+        "timestamp",
+    )
+
+    def __init__(self, start: int, end: int, timestamp: int, price, volume):
+        self.start = start
+        self.end = end
+        self.open = self.high = self.low = self.close = price
+        self.volume = volume
+        self.turnover = price * volume
+        self.timestamp = timestamp
+
+
+class BarBuilder:
+    """Aggregates trades into OHLCV and turnover bars of several intervals per
+    symbol, in a single pass over the trades.
+
+    A bar is closed by the first trade at or after its end: bars are emitted
+    in the order trades arrive and intervals without trades produce no bar.
+    Trades older than the running bar of an interval are added to it. Call
+    `close` to close the bars of a quiet market on a timer: trades received
+    afterwards for a bar it closed are dropped and counted in `late`, so that
+    a bar is never emitted twice.
+
+    Parameters
+    ----------
+
+    bar_sizes: list
+        The intervals of the bars, see `interval_ms`, ex: ['1s', '1m', '5m'].
+
+    partial: bool
+        Whether `update` also returns the running bars it touched.
+
+    scale: TickScale
+        When given, prices and volumes given as strings are converted to
+        integer ticks and lots, otherwise to floats. Numbers are used as is.
+    """
+
+    def __init__(
+        self,
+        bar_sizes: Iterable[int | str],
+        partial: bool = False,
+        scale: TickScale | None = None,
+    ):
+        self.intervals: List[Tuple[str, int, int]] = []
+        for bar_size in bar_sizes:
+            length = interval_ms(bar_size)
+            offset = _WEEK_OFFSET if length == _LETTERS["W"] else 0
+            self.intervals.append((str(bar_size), length, offset))
+        if not self.intervals:
+            raise ValueError("At least one bar size is required")
+        self.partial = partial
+        self._price = scale.to_ticks if scale else float
+        self._volume = scale.to_lots if scale else float
+        self._bars: Dict[str, List[_Bar | None]] = {}
+        # End of the last bar closed by `close`, by symbol then interval
+        self._closed: Dict[str, List[int]] = {}
+        self.late = 0
+
+    def add_trade(
+        self, symbol: str, timestamp: int, price, volume, out: List[CandleRecord]
+    ) -> None:
+        """Adds a trade to the bars of `symbol`, appending the bars it closes to
+        `out`.
+        """
+        bars = self._bars.get(symbol)
+        if bars is None:
+            bars = self._bars[symbol] = [None] * len(self.intervals)
+            self._closed[symbol] = [0] * len(self.intervals)
+        for i, (label, length, offset) in enumerate(self.intervals):
+            bar = bars[i]
+            if bar is None and timestamp < self._closed[symbol][i]:
+                self.late += 1
+                continue
+            if bar is not None and timestamp < bar.end:
+                if price > bar.high:
+                    bar.high = price
+                elif price < bar.low:
+                    bar.low = price
+                bar.close = price
+                bar.volume += volume
+                bar.turnover += price * volume
+                if timestamp > bar.timestamp:
+                    bar.timestamp = timestamp
+                continue
+            if bar is not None:
+                out.append(_to_record(symbol, label, bar, True))
+            start = (timestamp - offset) // length * length + offset
+            bars[i] = _Bar(start, start + length, timestamp, price, volume)
+
+    def update(self, message: Dict[str, Any]) -> List[CandleRecord] | None:
+        """Adds the trades of a publicTrade message.
+
+        returns
+        -------
+            The bars closed by the trades, followed by the running bars of the
+            symbols traded when `partial` is set. None if there are none.
+        """
+        out = []
+        to_price, to_volume = self._price, self._volume
+        symbols = set()
+        for trade in message["data"]:
+            price, volume = trade["p"], trade["v"]
+            if isinstance(price, str):
+                price, volume = to_price(price), to_volume(volume)
+            self.add_trade(trade["s"], trade["T"], price, volume, out)
+            symbols.add(trade["s"])
+        if self.partial:
+            for symbol in symbols:
+                out.extend(self.running(symbol))
+        return out or None
+
+    def running(self, symbol: str) -> List[CandleRecord]:
+        """The running bars of `symbol`, not confirmed."""
+        labels = [label for label, _, _ in self.intervals]
+        return [
+            _to_record(symbol, label, bar, False)
+            for label, bar in zip(labels, self._bars.get(symbol, ()))
+            if bar is not None
+        ]
+
+    def close(self, timestamp: int) -> List[CandleRecord]:
+        """Closes and returns the bars that ended at `timestamp`, ex. the
+        current time in milliseconds.
+        """
+        out = []
+        for symbol, bars in self._bars.items():
+            for i, (label, _, _) in enumerate(self.intervals):
+                bar = bars[i]
+                if bar is not None and bar.end <= timestamp:
+                    out.append(_to_record(symbol, label, bar, True))
+                    bars[i] = None
+                    self._closed[symbol][i] = bar.end
+        return out
+
+
+def _to_record(symbol: str, label: str, bar: _Bar, confirmed: bool) -> CandleRecord:
+    return CandleRecord(
+        symbol=symbol,
+        bar_size=label,
+        start=bar.start,
+        # Inclusive as for the klines
+        end=bar.end - 1,
+        open=bar.open,
+        high=bar.high,
+        low=bar.low,
+        close=bar.close,
+        volume=bar.volume,
+        turnover=bar.turnover,
+        confirmed=confirmed,
+        timestamp=bar.timestamp,
+    )
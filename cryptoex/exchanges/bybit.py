@@ -1,11 +1,21 @@
 import asyncio
+import inspect
 import time
-
-# import uuid
 import logging
-from typing import Any, Dict, Callable, Tuple
+from collections import deque
+from functools import partial
+from typing import Any, AsyncIterator, Dict, Callable, List, Tuple
 
 from cryptoex._exchange import Exchange
+from cryptoex.orderbook import (
+    OrderBook,
+    OrderBookArrays,
+    SharedBookPublisher,
+    shared_book_name,
+)
+from cryptoex.exchanges.records import BBORecord
+from cryptoex.exchanges.bars import BarBuilder
+from cryptoex.ticks import TickScale
 from cryptoex._authentication import hmac_signature
 
 from cryptoex.utils import build_message
@@ -17,14 +27,28 @@ from cryptoex.exchanges.utils import (
     exchanges_config,
     ExchangeEndpoints,
     callback_mapper,
+    next_cursor_params,
+    paginate,
 )
 from cryptoex.exchanges.formatters.bybit import BybitFormatter
 
 _logger = logging.getLogger(__name__)
 
 
+def _ignore(message):
+    """Callback of the subscriptions that only publish to shared memory."""
+
+
 class _BybitExchange(Exchange):
 
+    # Maximum depth of a REST orderbook snapshot per category
+    _rest_orderbook_depths = {"spot": 200, "linear": 500, "inverse": 500, "option": 25}
+    # Maximum number of deltas kept while an orderbook is resynchronised
+    _max_resync_buffer = 10_000
+    # Server timeout, too many visits, server error, IP rate limit and
+    # system frequency protection
+    _transient_error_codes = frozenset({10000, 10006, 10016, 10018, 10429})
+
     def __init__(self, *, testnet: bool, demo: bool, config: ExchangeConfig, **kwargs):
         super().__init__(
             testnet=testnet,
@@ -32,10 +56,25 @@ class _BybitExchange(Exchange):
             config=config,
             endpoints=ExchangeEndpoints.from_yaml("bybit.yml"),
             formatter=BybitFormatter,
+            limits_file="bybit_limits.yml",
             **kwargs,
         )
         self.mappings: ExchangeMappings = ExchangeMappings.from_yaml("bybit")
-        self._previous_snapshot = {}
+        # The state of the streams is keyed by topic and endpoint, like the
+        # subscriptions: a topic has no category
+        self._orderbooks: Dict[str, OrderBook] = {}
+        self._orderbook_arrays: Dict[str, OrderBookArrays] = {}
+        self._tick_scales: Dict[Tuple[str, str], TickScale] = {}
+        self._topic_scales: Dict[str, TickScale] = {}
+        self._topic_analytics: Dict[str, int] = {}
+        self._topic_max_depths: Dict[str, int | None] = {}
+        self._orderbook_categories: Dict[str, str] = {}
+        self._resync_buffers: Dict[str, deque] = {}
+        self._resync_overflows: Dict[str, bool] = {}
+        self._resync_tasks: Dict[str, asyncio.Task] = {}
+        self._resyncs: Dict[str, Dict[str, float]] = {}
+        self._publishers: Dict[str, SharedBookPublisher] = {}
+        self._bar_builders: Dict[str, BarBuilder] = {}
 
     @overrides(Exchange)
     def _private_headers(self, payload):
@@ -116,6 +155,34 @@ class _BybitExchange(Exchange):
         response = await super().fetch_positions(**kwargs)
         return response["result"]
 
+    @overrides(Exchange)
+    async def fetch_order_history(self, **kwargs):
+        """Fetch the history of the orders through REST API
+
+        Parameters
+        ----------
+
+        kwargs: dict
+            Contains the parameters corresponding to the endpoint.
+            Mandatory are:
+                - category: spot, linear, inverse, option
+
+        See
+        ---
+
+        https://bybit-exchange.github.io/docs/v5/order/order-list
+        """
+        response = await super().fetch_order_history(**kwargs)
+        return response["result"]
+
+    @overrides(Exchange)
+    def iter_order_history(self, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Yields every page of `fetch_order_history`, following the cursor.
+        Pages hold 50 orders by default.
+        """
+        kwargs.setdefault("limit", 50)
+        return paginate(self.fetch_order_history, kwargs, next_cursor_params)
+
     @overrides(Exchange)
     async def fetch_trading_fees(self, **kwargs):
         """Fetch trading fees data through REST API
@@ -173,6 +240,29 @@ class _BybitExchange(Exchange):
         response = await super().fetch_candlesticks(**kwargs)
         return response["result"]
 
+    @overrides(Exchange)
+    def iter_candlesticks(self, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Yields the candlesticks page by page, newest first, each page
+        ending just before the oldest bar of the previous one. Pages hold 1000
+        bars by default, the last page is the first one holding fewer bars or
+        reaching `start`.
+        """
+        kwargs.setdefault("limit", 1000)
+        return paginate(self.fetch_candlesticks, kwargs, self._next_bars_params)
+
+    @staticmethod
+    def _next_bars_params(
+        page: Dict[str, Any], params: Dict[str, Any]
+    ) -> Dict[str, Any] | None:
+        bars = page["bars"]
+        if len(bars) < params["limit"]:
+            return None
+        end = int(bars[-1]["time"]) - 1
+        start = params.get("start")
+        if start is not None and end < start:
+            return None
+        return {**params, "end": end}
+
     @overrides(Exchange)
     async def fetch_orderbook(self, **kwargs):
         """Downloads orderbook data
@@ -209,10 +299,8 @@ class _BybitExchange(Exchange):
         https://bybit-exchange.github.io/docs/v5/market/instrument
         """
         requests = (
-            self.fetch_instruments_details(category="spot"),
-            self.fetch_instruments_details(category="linear", limit=1000),
-            self.fetch_instruments_details(category="inverse", limit=1000),
-            self.fetch_instruments_details(category="option", limit=1000),
+            self._join_pages(self.iter_instruments_details(category=category))
+            for category in ("spot", "linear", "inverse", "option")
         )
         return dict(
             zip(
@@ -240,6 +328,88 @@ class _BybitExchange(Exchange):
         response = await super().fetch_instruments_details(**kwargs)
         return response["result"]
 
+    @overrides(Exchange)
+    def iter_instruments_details(self, **kwargs) -> AsyncIterator[Dict[str, Any]]:
+        """Yields every page of `fetch_instruments_details`, following the
+        cursor. Pages hold 1000 instruments by default, spot instruments are
+        not paginated.
+        """
+        if kwargs.get("category") != "spot":
+            kwargs.setdefault("limit", 1000)
+        return paginate(self.fetch_instruments_details, kwargs, next_cursor_params)
+
+    @staticmethod
+    async def _join_pages(
+        pages: AsyncIterator[Dict[str, Any]], key: str = "instruments"
+    ) -> Dict[str, Any]:
+        """Returns the first page with the `key` list of the following pages
+        appended to its own.
+        """
+        result = None
+        async for page in pages:
+            if result is None:
+                result = page
+            else:
+                result[key].extend(page[key])
+        return result
+
+    @overrides(Exchange)
+    async def load_tick_scales(
+        self, *, category: str, symbols: List[str] | None = None
+    ) -> Dict[str, TickScale]:
+        """Fetches the tick size and quantity step of instruments and keeps their
+        `TickScale` for the streams with the `ticks` option.
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbols: spot, linear, inverse, option
+
+        symbols: list
+            The instruments ex: [BTCUSDT, ETHUSDT]. All the instruments of the
+            category by default.
+
+        returns
+        -------
+            The scales per symbol.
+        """
+        wanted = {symbol.upper() for symbol in symbols or ()}
+        params = {"symbol": next(iter(wanted))} if len(wanted) == 1 else {}
+        result = await self._join_pages(
+            self.iter_instruments_details(category=category, **params)
+        )
+
+        scales = {}
+        for instrument in result["instruments"]:
+            symbol = instrument["symbol"]
+            if wanted and symbol not in wanted:
+                continue
+            scale = TickScale.from_instrument(instrument)
+            scales[symbol] = self._tick_scales[(category, symbol)] = scale
+        return scales
+
+    @overrides(Exchange)
+    def get_tick_scale(self, *, category: str, symbol: str) -> TickScale | None:
+        """Returns the `TickScale` loaded for an instrument, None if there is
+        none.
+        """
+        return self._tick_scales.get((category, symbol.upper()))
+
+    async def _assign_tick_scales(self, category: str, topics: Dict[str, str]) -> None:
+        """Makes the tick scales of the symbols available to the preprocessing
+        of their topics, fetching the missing ones.
+        """
+        missing = [s for s in topics.values() if (category, s) not in self._tick_scales]
+        if missing:
+            await self.load_tick_scales(category=category, symbols=missing)
+        endpoint = f"{self.public_endpoint}/{category}"
+        for topic, symbol in topics.items():
+            scale = self._tick_scales.get((category, symbol))
+            if scale is None:
+                raise ValueError(f"No instrument details for {symbol=} in {category=}")
+            self._topic_scales[topic + endpoint] = scale
+
     @overrides(Exchange)
     async def fetch_coin_details(self, **kwargs):
         """Query coin information, including chain information,
@@ -332,6 +502,13 @@ class _BybitExchange(Exchange):
         depth: int,
         callback: Callable | None = None,
         handle_delta: bool = True,
+        typed: bool = False,
+        arrays: bool = False,
+        ticks: bool = False,
+        shared_memory: bool = False,
+        reclaim_shared_memory: bool = False,
+        analytics_depth: int = 0,
+        max_depth: int | None = None,
         **kwargs,
     ):
         """Subscribes to orderbook stream to fetch orderbook data.
@@ -354,6 +531,55 @@ class _BybitExchange(Exchange):
             The function to call when new transaction messages are sent
             by the exchange.
 
+        handle_delta: bool
+            Whether to apply delta messages to the local orderbook and
+            send snapshots to the callback. When a gap is detected in the
+            update ids, the book is rebuilt from a REST snapshot and the
+            deltas received meanwhile are replayed on top of it. Nothing is
+            sent to the callback until the book is valid again.
+
+        typed: bool
+            Whether the callback receives a `QuoteRecord` with parsed prices
+            and volumes instead of the raw message.
+
+        arrays: bool
+            Whether the callback receives the `OrderBookArrays` of the topic:
+            float64 price and size arrays of shape (depth,) sorted best first.
+            The arrays are reused and overwritten by every update, so they
+            cannot be combined with `offload`, and a `queue_size` or a
+            coroutine callback requires `overflow='conflate'`. Requires
+            `handle_delta`.
+
+        ticks: bool
+            Whether prices and sizes are converted to integer ticks and lots
+            using the tick size and quantity step of the instrument, see
+            `load_tick_scales`. Applies to the local orderbook, the records,
+            the arrays and the snapshot messages.
+
+        shared_memory: bool
+            Whether every update of the local orderbook is also published to
+            a shared memory segment that processes can read with
+            `SharedBookReader`, see `get_shared_orderbook_name`. The callback
+            is optional in that case. Requires `handle_delta`.
+
+        reclaim_shared_memory: bool
+            Whether a segment of the same name that already exists, ex. left
+            over by a process that crashed, is taken over. Otherwise a
+            FileExistsError is raised, as another process may be publishing
+            the book. Requires `shared_memory`.
+
+        analytics_depth: int
+            Number of best levels over which the local orderbook maintains
+            its cumulative depth, imbalance and depth VWAP as deltas arrive,
+            see `OrderBook` and `get_orderbook`. Requires `handle_delta`.
+
+        max_depth: int
+            Maximum number of levels kept per side by the local orderbook.
+            Levels pushed beyond it by the deltas are dropped, which caps the
+            memory of the topic, see `get_orderbook_depths`. Defaults to no
+            limit. Requires `handle_delta`; a ValueError is raised when it is
+            lower than `depth`.
+
         kwargs: dict
             Contains extra arguments specific to bybit.
 
@@ -372,22 +598,225 @@ class _BybitExchange(Exchange):
         """
         topic = f"orderbook.{depth}.{symbol.upper()}"
         endpoint = f"{self.public_endpoint}/{category}"
+        if self._is_subscribed(topic + endpoint):
+            raise ValueError(f"{topic} is already streamed on {endpoint}")
+        self._check_max_depth(depth, max_depth)
+        if arrays:
+            self._check_arrays_delivery(callback, kwargs)
+        preprocess = self._orderbook_preprocess(
+            endpoint, handle_delta, typed, arrays, depth, ticks
+        )
+        if shared_memory:
+            preprocess = self._publish_preprocess(
+                endpoint, preprocess, callback is not None
+            )
+            callback = callback or _ignore
+        # Set before subscribing: the first snapshot can be received before
+        # the subscription returns.
+        path = topic + endpoint
+        if handle_delta:
+            self._orderbook_categories[path] = category
+            self._topic_analytics[path] = analytics_depth
+            self._topic_max_depths[path] = max_depth
+        subscribed = False
+        try:
+            if ticks:
+                await self._assign_tick_scales(category, {topic: symbol.upper()})
+            if shared_memory:
+                self._open_publishers(
+                    category, [topic], depth, reclaim_shared_memory
+                )
+            subscribed = await self._subscribe(
+                endpoint=endpoint,
+                topic=topic,
+                callback=callback,
+                preprocess=preprocess,
+                **kwargs,
+            )
+        finally:
+            if not subscribed:
+                self._release_orderbook_topics(endpoint, [topic])
 
-        if callback and handle_delta:
+    @overrides(Exchange)
+    async def stream_bbo(
+        self,
+        *,
+        category: str,
+        symbol: str,
+        callback: Callable | None = None,
+        depth: int = 1,
+        min_move: float | None = None,
+        ticks: bool = False,
+        **kwargs,
+    ):
+        """Subscribes to the best bid/offer of a symbol. The orderbook stream of
+        `depth` is applied to a local book and the callback only receives a
+        `BBORecord` when the best bid/ask price or size changes.
 
-            def _callback(message):
-                return callback(self.handle_orderbook_delta(message))
+        Parameters
+        ----------
 
-        else:
-            _callback = callback
+        category: str
+            The category of the symbol: spot, linear, inverse, option
 
-        await self._subscribe(
-            endpoint=endpoint, topic=topic, callback=_callback, **kwargs
+        symbol: str
+            The instrument ex: BTCUSDT
+
+        callback: Callable
+            The function to call with a `BBORecord` when the best bid/offer
+            changes.
+
+        depth: int
+            The depth of the orderbook stream the book is built from. The
+            depth 1 stream is the lightest, see `stream_orderbook` for the
+            supported depths. The stream is subscribed by this method: it
+            cannot be streamed with `stream_orderbook` at the same time, use
+            the `typed` records of `stream_orderbook` instead.
+
+        min_move: float
+            When set, size changes are ignored and the callback is only called
+            when the best bid or ask price moved by at least `min_move` since
+            the last call. In ticks when `ticks` is set.
+
+        ticks: bool
+            Whether prices and sizes are integer ticks and lots, see
+            `load_tick_scales`.
+
+        kwargs: dict
+            Contains extra arguments specific to bybit.
+
+        see
+        ---
+
+        https://bybit-exchange.github.io/docs/v5/websocket/public/orderbook
+
+        """
+        topic = f"orderbook.{depth}.{symbol.upper()}"
+        endpoint = f"{self.public_endpoint}/{category}"
+        if self._is_subscribed(topic + endpoint):
+            raise ValueError(
+                f"{topic} is already streamed on {endpoint}, use another depth"
+            )
+        if ticks:
+            await self._assign_tick_scales(category, {topic: symbol.upper()})
+        # Set before subscribing: the first snapshot can be received before
+        # the subscription returns.
+        self._orderbook_categories[topic + endpoint] = category
+
+        subscribed = False
+        try:
+            subscribed = await self._subscribe(
+                endpoint=endpoint,
+                topic=topic,
+                callback=callback,
+                preprocess=self._bbo_preprocess(endpoint, min_move),
+                **kwargs,
+            )
+        finally:
+            if not subscribed:
+                self._release_orderbook_topics(endpoint, [topic])
+
+    @overrides(Exchange)
+    async def stream_bars(
+        self,
+        *,
+        category: str,
+        symbol: str,
+        bar_sizes: List[int | str],
+        callback: Callable | None = None,
+        partial: bool = False,
+        ticks: bool = False,
+        **kwargs,
+    ):
+        """Subscribes to the trade stream of a symbol and aggregates the trades
+        into bars of several intervals at once, see `BarBuilder`.
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbol: spot, linear, inverse, option
+
+        symbol: str
+            The instrument ex: BTCUSDT
+
+        bar_sizes: list
+            The intervals of the bars: minutes as for the klines, D, W, or
+            a number and a unit among ms, s, m, h and d, ex: ['5s', '1m', 15].
+
+        callback: Callable
+            The function to call with the list of `CandleRecord` closed by a
+            message, confirmed, followed by the running bars with `partial`.
+
+        partial: bool
+            Whether the running bars are also sent after every message.
+
+        ticks: bool
+            Whether prices and volumes are integer ticks and lots, see
+            `load_tick_scales`. The turnover is then in ticks times lots.
+
+        kwargs: dict
+            Contains extra arguments specific to bybit.
+
+        Note
+        ----
+
+        A bar is closed by the first trade after its end. Use
+        `get_bar_builder(symbol=...).close(timestamp)` to close the bars of a
+        quiet market. The trade stream is subscribed by this method: it
+        cannot be streamed with `stream_trades` at the same time.
+
+        see
+        ---
+
+        https://bybit-exchange.github.io/docs/v5/websocket/public/trade
+
+        """
+        topic = f"publicTrade.{symbol.upper()}"
+        endpoint = f"{self.public_endpoint}/{category}"
+        if self._is_subscribed(topic + endpoint):
+            raise ValueError(f"{topic} is already streamed on {endpoint}")
+        if ticks:
+            await self._assign_tick_scales(category, {topic: symbol.upper()})
+        builder = BarBuilder(
+            bar_sizes, partial, self._topic_scales[topic + endpoint] if ticks else None
         )
+        subscribed = False
+        try:
+            subscribed = await self._subscribe(
+                endpoint=endpoint,
+                topic=topic,
+                callback=callback,
+                preprocess=builder.update,
+                **kwargs,
+            )
+        finally:
+            if not subscribed:
+                self._topic_scales.pop(topic + endpoint, None)
+        if subscribed:
+            self._bar_builders[topic + endpoint] = builder
+
+    @overrides(Exchange)
+    def get_bar_builder(
+        self, *, symbol: str, category: str | None = None
+    ) -> BarBuilder | None:
+        """Returns the `BarBuilder` of a `stream_bars` subscription, None if
+        there is none. The `category` is required when the symbol is streamed
+        in several categories.
+        """
+        topic = f"publicTrade.{symbol.upper()}"
+        return self._find_topic_state(self._bar_builders, topic, category)
 
     @overrides(Exchange)
     async def stream_trades(
-        self, *, category: str, symbol: str, callback: Callable | None = None, **kwargs
+        self,
+        *,
+        category: str,
+        symbol: str,
+        callback: Callable | None = None,
+        typed: bool = False,
+        ticks: bool = False,
+        **kwargs,
     ):
         """Subscribes to trade stream
 
@@ -404,6 +833,14 @@ class _BybitExchange(Exchange):
             The function to call when new transaction messages are sent
             by the exchange.
 
+        typed: bool
+            Whether the callback receives a list of `TradeRecord` instead of
+            the raw message.
+
+        ticks: bool
+            Whether trade prices and volumes are converted to integer ticks
+            and lots, see `load_tick_scales`.
+
         kwargs: dict
             Contains extra arguments specific to bybit.
 
@@ -415,9 +852,22 @@ class _BybitExchange(Exchange):
         """
         topic = f"publicTrade.{symbol.upper()}"
         endpoint = f"{self.public_endpoint}/{category}"
-        await self._subscribe(
-            endpoint=endpoint, topic=topic, callback=callback, **kwargs
-        )
+        # A topic already streamed keeps its scale
+        streamed = self._is_subscribed(topic + endpoint)
+        if ticks and not streamed:
+            await self._assign_tick_scales(category, {topic: symbol.upper()})
+        subscribed = False
+        try:
+            subscribed = await self._subscribe(
+                endpoint=endpoint,
+                topic=topic,
+                callback=callback,
+                preprocess=self._trades_preprocess(endpoint, typed, ticks),
+                **kwargs,
+            )
+        finally:
+            if not subscribed and not streamed:
+                self._topic_scales.pop(topic + endpoint, None)
 
     @overrides(Exchange)
     async def stream_candlesticks(
@@ -427,6 +877,7 @@ class _BybitExchange(Exchange):
         symbol: str,
         bar_size: int | str,
         callback: Callable | None = None,
+        typed: bool = False,
         **kwargs,
     ):
         """streams candlesticks updates
@@ -448,6 +899,10 @@ class _BybitExchange(Exchange):
             The function to call when new transaction messages are sent
             by the exchange.
 
+        typed: bool
+            Whether the callback receives a list of `CandleRecord` instead of
+            the raw message.
+
         kwargs: dict
             Contains extra arguments specific to bybit.
 
@@ -463,7 +918,178 @@ class _BybitExchange(Exchange):
         topic = f"kline.{bar_size}.{symbol.upper()}"
         endpoint = f"{self.public_endpoint}/{category}"
         await self._subscribe(
-            endpoint=endpoint, topic=topic, callback=callback, **kwargs
+            endpoint=endpoint,
+            topic=topic,
+            callback=callback,
+            preprocess=self.formatter.to_candle_records if typed else None,
+            **kwargs,
+        )
+
+    @overrides(Exchange)
+    async def stream_orderbooks(
+        self,
+        *,
+        category: str,
+        symbols: List[str],
+        depth: int,
+        callback: Callable | None = None,
+        handle_delta: bool = True,
+        typed: bool = False,
+        arrays: bool = False,
+        ticks: bool = False,
+        shared_memory: bool = False,
+        reclaim_shared_memory: bool = False,
+        analytics_depth: int = 0,
+        max_depth: int | None = None,
+        **kwargs,
+    ) -> List[str]:
+        """Subscribes to the orderbook streams of several symbols at once.
+
+        Topics are sent in chunks of `_max_topics_per_request` per subscribe
+        operation and the acknowledgments are awaited concurrently.
+
+        Parameters
+        ----------
+
+        symbols: list
+            The instruments ex: [BTCUSDT, ETHUSDT]
+
+        See `stream_orderbook` for the other parameters.
+
+        returns
+        -------
+            The topics for which the subscription failed.
+        """
+        topics = [f"orderbook.{depth}.{symbol.upper()}" for symbol in symbols]
+        endpoint = f"{self.public_endpoint}/{category}"
+        self._check_max_depth(depth, max_depth)
+        if arrays:
+            self._check_arrays_delivery(callback, kwargs)
+        preprocess = self._orderbook_preprocess(
+            endpoint, handle_delta, typed, arrays, depth, ticks
+        )
+        if shared_memory:
+            preprocess = self._publish_preprocess(
+                endpoint, preprocess, callback is not None
+            )
+            callback = callback or _ignore
+        # The topics already streamed are skipped by _subscribe_many and keep
+        # their settings
+        new_symbols = {
+            t: s.upper()
+            for t, s in zip(topics, symbols)
+            if not self._is_subscribed(t + endpoint)
+        }
+        new_topics = list(new_symbols)
+        if handle_delta:
+            paths = [topic + endpoint for topic in new_topics]
+            self._orderbook_categories.update(dict.fromkeys(paths, category))
+            self._topic_analytics.update(dict.fromkeys(paths, analytics_depth))
+            self._topic_max_depths.update(dict.fromkeys(paths, max_depth))
+        failed = new_topics
+        try:
+            if ticks:
+                await self._assign_tick_scales(category, new_symbols)
+            if shared_memory:
+                self._open_publishers(
+                    category, new_topics, depth, reclaim_shared_memory
+                )
+            failed = await self._subscribe_many(
+                endpoint=endpoint,
+                topics=topics,
+                callback=callback,
+                preprocess=preprocess,
+                **kwargs,
+            )
+        finally:
+            self._release_orderbook_topics(
+                endpoint, [t for t in failed if t in new_symbols]
+            )
+        return failed
+
+    @overrides(Exchange)
+    async def stream_multiple_trades(
+        self,
+        *,
+        category: str,
+        symbols: List[str],
+        callback: Callable | None = None,
+        typed: bool = False,
+        ticks: bool = False,
+        **kwargs,
+    ) -> List[str]:
+        """Subscribes to the trade streams of several symbols at once.
+
+        Parameters
+        ----------
+
+        symbols: list
+            The instruments ex: [BTCUSDT, ETHUSDT]
+
+        See `stream_trades` for the other parameters.
+
+        returns
+        -------
+            The topics for which the subscription failed.
+        """
+        topics = [f"publicTrade.{symbol.upper()}" for symbol in symbols]
+        endpoint = f"{self.public_endpoint}/{category}"
+        # The topics already streamed keep their scales
+        new_symbols = {
+            t: s.upper()
+            for t, s in zip(topics, symbols)
+            if not self._is_subscribed(t + endpoint)
+        }
+        if ticks:
+            await self._assign_tick_scales(category, new_symbols)
+        failed = list(new_symbols)
+        try:
+            failed = await self._subscribe_many(
+                endpoint=endpoint,
+                topics=topics,
+                callback=callback,
+                preprocess=self._trades_preprocess(endpoint, typed, ticks),
+                **kwargs,
+            )
+        finally:
+            for topic in failed:
+                if topic in new_symbols:
+                    self._topic_scales.pop(topic + endpoint, None)
+        return failed
+
+    @overrides(Exchange)
+    async def stream_multiple_candlesticks(
+        self,
+        *,
+        category: str,
+        symbols: List[str],
+        bar_size: int | str,
+        callback: Callable | None = None,
+        typed: bool = False,
+        **kwargs,
+    ) -> List[str]:
+        """Subscribes to the candlesticks streams of several symbols at once.
+
+        Parameters
+        ----------
+
+        symbols: list
+            The instruments ex: [BTCUSDT, ETHUSDT]
+
+        See `stream_candlesticks` for the other parameters.
+
+        returns
+        -------
+            The topics for which the subscription failed.
+        """
+        topics = [f"kline.{bar_size}.{symbol.upper()}" for symbol in symbols]
+        endpoint = f"{self.public_endpoint}/{category}"
+        return await self._subscribe_many(
+            endpoint=endpoint,
+            topics=topics,
+            callback=callback,
+            preprocess=self.formatter.to_candle_records if typed else None,
+            **kwargs,
         )
 
     @overrides(Exchange)
@@ -666,7 +1292,69 @@ class _BybitExchange(Exchange):
         await self._unsubscribe(
             endpoint=endpoint, topic=topic, close_socket=close_socket, **kwargs
         )
+        self._invalidate_topics(endpoint, [topic])
+        self._release_orderbook_topics(endpoint, [topic])
+
+    @overrides(Exchange)
+    async def cancel_stream_bbo(
+        self,
+        *,
+        category: str,
+        symbol: str,
+        depth: int = 1,
+        close_socket: bool = False,
+        **kwargs,
+    ):
+        """Cancels best bid/offer feed
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbol: spot, linear, inverse, option
+
+        symbol: str
+            The instrument ex: BTCUSDT
+
+        depth: int
+            The depth of the orderbook stream the feed is built from.
+
+        kwargs: dict
+            Contains extra arguments specific to bybit.
+        """
+        await self.cancel_stream_orderbook(
+            category=category,
+            symbol=symbol,
+            depth=depth,
+            close_socket=close_socket,
+            **kwargs,
+        )
+
+    @overrides(Exchange)
+    async def cancel_stream_bars(
+        self, *, category: str, symbol: str, close_socket: bool = False, **kwargs
+    ):
+        """Cancels the bars feed, the running bars are discarded.
+
+        Parameters
+        ----------
+
+        category: str
+            The category of the symbol: spot, linear, inverse, option
+
+        symbol: str
+            The instrument ex: BTCUSDT
+
+        kwargs: dict
+            Contains extra arguments specific to bybit.
+        """
+        await self.cancel_stream_trades(
+            category=category, symbol=symbol, close_socket=close_socket, **kwargs
+        )
+        endpoint = f"{self.public_endpoint}/{category}"
+        self._bar_builders.pop(f"publicTrade.{symbol.upper()}{endpoint}", None)
 
+    @overrides(Exchange)
     async def cancel_stream_trades(
         self, *, category: str, symbol: str, close_socket: bool = False, **kwargs
     ):
@@ -689,6 +1377,7 @@ class _BybitExchange(Exchange):
         await self._unsubscribe(
             endpoint=endpoint, topic=topic, close_socket=close_socket, **kwargs
         )
+        self._topic_scales.pop(topic + endpoint, None)
 
     async def cancel_stream_candlesticks(
         self,
@@ -719,6 +1408,78 @@ class _BybitExchange(Exchange):
             endpoint=endpoint, topic=topic, close_socket=close_socket, **kwargs
         )
 
+    async def cancel_stream_orderbooks(
+        self,
+        *,
+        category: str,
+        symbols: List[str],
+        depth: int,
+        close_socket: bool = False,
+        **kwargs,
+    ):
+        """Cancels the orderbook feeds of several symbols at once
+
+        see
+        ---
+
+        https://bybit-exchange.github.io/docs/v5/websocket/public/orderbook
+
+        """
+        topics = [f"orderbook.{depth}.{symbol.upper()}" for symbol in symbols]
+        endpoint = f"{self.public_endpoint}/{category}"
+        await self._unsubscribe_many(
+            endpoint=endpoint, topics=topics, close_socket=close_socket, **kwargs
+        )
+        self._invalidate_topics(endpoint, topics)
+        self._release_orderbook_topics(endpoint, topics)
+
+    async def cancel_stream_multiple_trades(
+        self,
+        *,
+        category: str,
+        symbols: List[str],
+        close_socket: bool = False,
+        **kwargs,
+    ):
+        """Cancels the trade feeds of several symbols at once
+
+        see
+        ---
+
+        https://bybit-exchange.github.io/docs/v5/websocket/public/trade
+
+        """
+        topics = [f"publicTrade.{symbol.upper()}" for symbol in symbols]
+        endpoint = f"{self.public_endpoint}/{category}"
+        await self._unsubscribe_many(
+            endpoint=endpoint, topics=topics, close_socket=close_socket, **kwargs
+        )
+        for topic in topics:
+            self._topic_scales.pop(topic + endpoint, None)
+
+    async def cancel_stream_multiple_candlesticks(
+        self,
+        *,
+        category: str,
+        symbols: List[str],
+        bar_size: int | str,
+        close_socket: bool = False,
+        **kwargs,
+    ):
+        """Cancels the candlesticks feeds of several symbols at once
+
+        see
+        ---
+
+        https://bybit-exchange.github.io/docs/v5/websocket/public/kline
+
+        """
+        topics = [f"kline.{bar_size}.{symbol.upper()}" for symbol in symbols]
+        endpoint = f"{self.public_endpoint}/{category}"
+        await self._unsubscribe_many(
+            endpoint=endpoint, topics=topics, close_socket=close_socket, **kwargs
+        )
+
     async def cancel_stream_wallets(self, close_socket: bool = False, **kwargs):
         """Cancels wallets feed
 
@@ -744,6 +1505,227 @@ class _BybitExchange(Exchange):
     # +  WS formatting callbacks  +
     # +---------------------------+
 
+    @staticmethod
+    def _check_arrays_delivery(callback: Callable | None, options: Dict) -> None:
+        """The `OrderBookArrays` of a topic are overwritten in place by every
+        update: they can only be handed to a callback that runs before the
+        next update, or through a conflated queue that holds a single
+        reference.
+        """
+        if options.get("offload"):
+            raise ValueError("arrays cannot be combined with offload")
+        queued = options.get("queue_size") or inspect.iscoroutinefunction(callback)
+        if queued and options.get("overflow", "block") != "conflate":
+            raise ValueError(
+                "arrays requires overflow='conflate' with a queue_size or a "
+                "coroutine callback"
+            )
+
+    @staticmethod
+    def _check_max_depth(depth: int, max_depth: int | None) -> None:
+        """A book trimmed below the depth of its topic would drop the levels
+        of every snapshot and push.
+        """
+        if max_depth is not None and max_depth < depth:
+            raise ValueError(f"{max_depth=} is lower than the topic {depth=}")
+
+    def _orderbook_preprocess(
+        self,
+        endpoint: str,
+        handle_delta: bool,
+        typed: bool,
+        arrays: bool,
+        depth: int,
+        ticks: bool,
+    ) -> Callable | None:
+        """Builds the function applied to orderbook pushes of an endpoint in the
+        reader: delta handling and record, array or tick decoding.
+        """
+        if arrays and not handle_delta:
+            raise ValueError("arrays requires handle_delta")
+        if arrays and typed:
+            raise ValueError("Choose either typed or arrays")
+
+        to_record = self.formatter.to_quote_record
+        update_orderbook = partial(self.update_orderbook, endpoint=endpoint)
+        scales = self._topic_scales
+        if arrays:
+            orderbook_arrays = self._orderbook_arrays
+
+            def _preprocess(message):
+                book = update_orderbook(message)
+                if book is None:
+                    return None
+                topic = message["topic"]
+                path = topic + endpoint
+                buffers = orderbook_arrays.get(path)
+                if buffers is None:
+                    buffers = orderbook_arrays[path] = OrderBookArrays(depth, topic)
+                return buffers.update(book)
+
+        elif handle_delta and typed:
+
+            def _preprocess(message):
+                book = update_orderbook(message)
+                return None if book is None else to_record(message, book)
+
+        elif handle_delta:
+            _preprocess = partial(self.handle_orderbook_delta, endpoint=endpoint)
+        elif typed and ticks:
+
+            def _preprocess(message):
+                return to_record(message, scale=scales[message["topic"] + endpoint])
+
+        elif typed:
+            _preprocess = to_record
+        elif ticks:
+
+            def _preprocess(message):
+                scale = scales[message["topic"] + endpoint]
+                data = message["data"]
+                data["b"] = scale.to_levels(data["b"])
+                data["a"] = scale.to_levels(data["a"])
+                return message
+
+        else:
+            _preprocess = None
+        return _preprocess
+
+    def _publish_preprocess(
+        self, endpoint: str, preprocess: Callable | None, forward: bool
+    ) -> Callable:
+        """Wraps the orderbook preprocessing so that every update of the local
+        book is published to the shared memory segment of its topic, see
+        `_open_publishers`. The result of `preprocess` is only forwarded to the
+        callback if `forward`.
+        """
+        if preprocess is None:
+            raise ValueError("shared_memory requires handle_delta")
+        publishers = self._publishers
+        orderbooks = self._orderbooks
+
+        def _preprocess(message):
+            result = preprocess(message)
+            if result is not None:
+                path = message["topic"] + endpoint
+                publishers[path].publish(orderbooks[path])
+            return result if forward else None
+
+        return _preprocess
+
+    def get_shared_orderbook_name(
+        self, *, category: str, symbol: str, depth: int
+    ) -> str:
+        """Name of the shared memory segment the orderbook of a symbol is
+        published to by `stream_orderbook(shared_memory=True)`. Pass it to
+        `SharedBookReader` in the consumer processes.
+        """
+        topic = f"orderbook.{depth}.{symbol.upper()}"
+        return shared_book_name(self._name, category, topic)
+
+    def close_shared_orderbooks(self) -> None:
+        """Removes all the shared memory segments of the published books."""
+        while self._publishers:
+            self._publishers.popitem()[1].close()
+
+    def _open_publishers(
+        self, category: str, topics: List[str], depth: int, reclaim: bool
+    ) -> None:
+        endpoint = f"{self.public_endpoint}/{category}"
+        for topic in topics:
+            if topic + endpoint not in self._publishers:
+                name = shared_book_name(self._name, category, topic)
+                self._publishers[topic + endpoint] = SharedBookPublisher(
+                    name, depth, reclaim
+                )
+
+    def _close_publishers(self, endpoint: str, topics: List[str]) -> None:
+        for topic in topics:
+            publisher = self._publishers.pop(topic + endpoint, None)
+            if publisher is not None:
+                publisher.close()
+
+    def _release_orderbook_topics(self, endpoint: str, topics: List[str]) -> None:
+        """Drops the local books, arrays, settings and shared memory segments
+        of orderbook topics whose subscription failed or was cancelled.
+        """
+        for topic in topics:
+            self._orderbooks.pop(topic + endpoint, None)
+            self._orderbook_arrays.pop(topic + endpoint, None)
+            self._topic_scales.pop(topic + endpoint, None)
+            self._orderbook_categories.pop(topic + endpoint, None)
+            self._topic_analytics.pop(topic + endpoint, None)
+            self._topic_max_depths.pop(topic + endpoint, None)
+        self._close_publishers(endpoint, topics)
+
+    def _bbo_preprocess(self, endpoint: str, min_move: float | None) -> Callable:
+        """Builds the function applied to orderbook pushes in the reader for the
+        best bid/offer streams: the book is updated and a `BBORecord` is only
+        returned when the best levels changed (by `min_move` if set).
+        """
+        update_orderbook = partial(self.update_orderbook, endpoint=endpoint)
+        last_sent = {}
+
+        def moved(previous, best):
+            if previous is None or best is None:
+                return previous is not best
+            return abs(best[0] - previous[0]) >= min_move
+
+        def _preprocess(message):
+            book = update_orderbook(message)
+            if book is None:
+                return None
+            topic = message["topic"]
+            bid, ask = book.bids.best(), book.asks.best()
+            previous = last_sent.get(topic)
+            if previous is not None:
+                if min_move is None:
+                    if previous == (bid, ask):
+                        return None
+                elif not (moved(previous[0], bid) or moved(previous[1], ask)):
+                    return None
+            last_sent[topic] = (bid, ask)
+            return BBORecord(
+                topic=topic,
+                symbol=book.symbol,
+                timestamp=book.timestamp,
+                update_id=book.update_id,
+                bid_price=bid and bid[0],
+                bid_size=bid and bid[1],
+                ask_price=ask and ask[0],
+                ask_size=ask and ask[1],
+            )
+
+        return _preprocess
+
+    def _trades_preprocess(
+        self, endpoint: str, typed: bool, ticks: bool
+    ) -> Callable | None:
+        """Builds the function applied to trade pushes in the reader: record or
+        tick decoding.
+        """
+        to_records = self.formatter.to_trade_records
+        scales = self._topic_scales
+        if typed and ticks:
+
+            def _preprocess(message):
+                return to_records(message, scales[message["topic"] + endpoint])
+
+        elif typed:
+            _preprocess = to_records
+        elif ticks:
+
+            def _preprocess(message):
+                scale = scales[message["topic"] + endpoint]
+                for trade in message["data"]:
+                    trade["p"] = scale.to_ticks(trade["p"])
+                    trade["v"] = scale.to_lots(trade["v"])
+                return message
+
+        else:
+            _preprocess = None
+        return _preprocess
+
     @callback_mapper(attribute="orders", endpoint="orders")
     @overrides(Exchange)
     def _callback_order_stream(callback, *, message):
@@ -764,20 +1746,44 @@ class _BybitExchange(Exchange):
     # +-----------------------+
 
     @overrides(Exchange)
-    def _generate_subscription_message(self, topic: str, **kwargs) -> str:
+    def _generate_subscription_message(self, topics: List[str], **kwargs) -> str:
         """Method that builds the subscription message for websocket streams"""
-        # req_id not set for now.
-        # req_id = str(uuid.uuid4())
-        return build_message(op="subscribe", args=[topic], **kwargs)
+        # req_id is set in kwargs by the manager to match the reply
+        return build_message(op="subscribe", args=topics, codec=self._codec, **kwargs)
 
     @overrides(Exchange)
-    def _generate_unsubscription_message(self, topic: str, **kwargs) -> str:
+    def _generate_unsubscription_message(self, topics: List[str], **kwargs) -> str:
         """Method that builds the unsubscription message for
         websocket streams
 
         """
-        # req_id = str(uuid.uuid4())
-        return build_message(op="unsubscribe", args=[topic], **kwargs)
+        return build_message(
+            op="unsubscribe", args=topics, codec=self._codec, **kwargs
+        )
+
+    @overrides(Exchange)
+    def _generate_ping_message(self, **kwargs) -> str:
+        """Method that builds the application level heartbeat message"""
+        return build_message(op="ping", codec=self._codec, **kwargs)
+
+    @overrides(Exchange)
+    def _invalidate_topics(self, endpoint: str, topics: List[str]) -> None:
+        for topic in topics:
+            self._cancel_resync(topic + endpoint)
+            self._orderbooks.pop(topic + endpoint, None)
+
+    @overrides(Exchange)
+    def _get_reply_id(self, message: Dict[str, Any]) -> str | None:
+        return message.get("req_id")
+
+    @overrides(Exchange)
+    def _get_message_topic(self, message: Dict[str, Any]) -> str | None:
+        return message.get("topic")
+
+    @overrides(Exchange)
+    def _get_topic_symbol(self, topic: str) -> str:
+        # Market data topics end with the symbol: orderbook.50.BTCUSDT
+        return topic.rsplit(".", 1)[-1]
 
     @overrides(Exchange)
     def _get_reply_status(self, message: Dict[str, Any]) -> Tuple[bool, str]:
@@ -804,11 +1810,15 @@ class _BybitExchange(Exchange):
         signature = hmac_signature(
             api_secret=self._secret, payload=f"GET/realtime{expires}"
         )
-        message = build_message(op="auth", args=[self._key, expires, signature])
+        message = build_message(
+            op="auth", args=[self._key, expires, signature], codec=self._codec
+        )
         return message
 
     @overrides(Exchange)
-    def handle_orderbook_delta(self, message: Dict[str, Any]) -> Dict[str, Any]:
+    def handle_orderbook_delta(
+        self, message: Dict[str, Any], endpoint: str = ""
+    ) -> Dict[str, Any]:
         """Manages delta messages sent from the exchange.
 
         When an exchange sends a snapshot this is saved in order to build a local
@@ -817,50 +1827,278 @@ class _BybitExchange(Exchange):
 
         Note: If a depth `d` is retrieved from the exchange, depending on delta messages
         we might not get the same depth after processing as the original message.
-        Sometimes we get more sometimes less. You might want to restric the depth of
-        the messages to a certain `max_depth` in order to have a consistent bid/ask
-        lengths, otherwise you should increase the depth you get from the exchange.
+        Sometimes we get more sometimes less. Pass a `max_depth` to `stream_orderbook`
+        to bound the number of levels kept, otherwise you should increase the depth
+        you get from the exchange.
 
         Parameters
         ----------
             message: dict
                 A snapshot or delta message sent by the exchange
 
+            endpoint: str
+                The endpoint the message was received on, see
+                `update_orderbook`.
+
         returns
         -------
             message: dict
-                a snapshot message computed from the delta.
+                a snapshot message computed from the delta, with the levels sorted
+                best first. Levels are (ticks, lots) for streams with `ticks`.
+                None while the book is being resynchronised.
         """
-        topic = message["topic"]
+        book = self.update_orderbook(message, endpoint)
+        if book is None:
+            return None
+        if book.scale is None:
+            levels = book.snapshot()
+        else:
+            levels = {"b": book.bids.levels(), "a": book.asks.levels()}
         # Change only the bid/ask data keep the rest untouched
-        new_message = {**message}
-        if message["type"] != "snapshot":
-            uid = message["data"]["u"]
-            puid = self._previous_snapshot[topic]["data"]["u"]
-            if uid <= puid:
+        return {**message, "type": "snapshot", "data": message["data"] | levels}
+
+    @overrides(Exchange)
+    def update_orderbook(
+        self, message: Dict[str, Any], endpoint: str = ""
+    ) -> OrderBook | None:
+        """Applies a snapshot or delta message to the local orderbook of its topic
+        and returns the book. Unlike `handle_orderbook_delta`, nothing is copied.
+        The books are kept per topic and `endpoint`, the endpoint the message
+        was received on: the topics of the categories are the same.
+
+        A delta whose update id does not follow the one of the book is a gap: for
+        the streamed topics the book is marked invalid and resynchronised from a
+        REST snapshot (see `_resync_orderbook`), None is returned until then.
+        Otherwise, ex. when replaying files, a warning is logged.
+        """
+        path = message["topic"] + endpoint
+        data = message["data"]
+        if message["type"] == "snapshot":
+            self._cancel_resync(path)
+            book = self._orderbooks.get(path)
+            scale = self._topic_scales.get(path)
+            top_levels = self._topic_analytics.get(path, 0)
+            max_depth = self._topic_max_depths.get(path)
+            if (
+                book is None
+                or book.scale is not scale
+                or book.bids.top_levels != top_levels
+                or book.max_depth != max_depth
+            ):
+                book = self._orderbooks[path] = OrderBook(
+                    data["s"], scale, top_levels, max_depth
+                )
+            book.apply_snapshot(
+                data["b"], data["a"], data["u"], data.get("seq"), message["ts"]
+            )
+            return book
+
+        buffer = self._resync_buffers.get(path)
+        if buffer is not None:
+            if len(buffer) >= self._max_resync_buffer:
+                # The deltas are lost from here: only a snapshot more recent
+                # than the next buffered delta can rebuild the book
                 _logger.warning(
-                    f"Received an update id {uid} lower than in the previous message "
-                    f"{puid}"
+                    f"[{self._name}]: The resync buffer of {path} overflowed"
                 )
-            data = {}
-
-            for side in ("b", "a"):
-                prices = message["data"][side]
-                prev_prices = {
-                    k: v for k, v in self._previous_snapshot[topic]["data"][side]
-                }
-                for price, volume in prices:
-                    if volume == "0":
-                        if price in prev_prices:
-                            del prev_prices[price]
-                    else:
-                        prev_prices[price] = volume
-                data[side] = [[k, v] for k, v in prev_prices.items()]
-            new_message["type"] = "snapshot"
-            new_message["data"] = message["data"] | data
-
-        self._previous_snapshot[topic] = new_message
-        return new_message
+                self._resyncs[path]["overflows"] += 1
+                self._resync_overflows[path] = True
+                buffer.clear()
+            buffer.append(message)
+            return None
+
+        book = self._orderbooks[path]
+        uid = data["u"]
+        seq = data.get("seq")
+        previous = book.update_id
+        if previous is not None and uid != previous + 1:
+            if path in self._orderbook_categories:
+                self._start_resync(path, message)
+                return None
+            _logger.warning(
+                f"Received an update id {uid} that does not follow the previous "
+                f"one {previous}"
+            )
+        elif seq is not None and book.seq_id is not None and seq <= book.seq_id:
+            # Already part of the REST snapshot the book was rebuilt from
+            book.update_id = uid
+            return None
+        book.apply_delta(data["b"], data["a"], uid, seq, message["ts"])
+        return book
+
+    def _start_resync(self, path: str, message: Dict[str, Any]) -> None:
+        book = self._orderbooks[path]
+        _logger.warning(
+            f"[{self._name}]: Gap in the update ids of {path}: "
+            f"{book.update_id} -> {message['data']['u']}. Resynchronising"
+        )
+        book.valid = False
+        metrics = self._resyncs.setdefault(
+            path,
+            {
+                "gaps": 0,
+                "resyncs": 0,
+                "failures": 0,
+                "stale_snapshots": 0,
+                "overflows": 0,
+                "last_time": 0.0,
+                "max_time": 0.0,
+            },
+        )
+        metrics["gaps"] += 1
+        self._resync_buffers[path] = deque([message])
+        self._resync_overflows[path] = False
+        self._resync_tasks[path] = asyncio.create_task(
+            self._resync_orderbook(path), name=f"resync-{path}"
+        )
+
+    def _cancel_resync(self, path: str) -> None:
+        self._resync_buffers.pop(path, None)
+        self._resync_overflows.pop(path, None)
+        task = self._resync_tasks.pop(path, None)
+        if task is not None and task is not asyncio.current_task():
+            task.cancel()
+
+    async def _resync_orderbook(self, path: str) -> None:
+        """Rebuilds the book of a topic and endpoint (`path`) from a REST
+        snapshot, then replays the buffered deltas that are more recent than the
+        snapshot (by `seq`). The request is retried with an exponential backoff
+        until it succeeds or a snapshot is received from the stream.
+
+        The snapshot must not be older than the first buffered delta, else the
+        deltas in between would be missing: a stale snapshot is requested
+        again. The buffer holds at most `_max_resync_buffer` deltas, it is
+        emptied when it overflows so that its first delta follows the lost
+        ones.
+        """
+        start = time.perf_counter()
+        metrics = self._resyncs[path]
+        topic = path.split("/", 1)[0]
+        _, depth, symbol = topic.split(".")
+        category = self._orderbook_categories[path]
+        limit = min(int(depth), self._rest_orderbook_depths.get(category, 25))
+        delay = 0.1
+        while True:
+            self._resync_overflows[path] = False
+            try:
+                result = await self.fetch_orderbook(
+                    category=category, symbol=symbol, limit=limit
+                )
+            except Exception as e:
+                metrics["failures"] += 1
+                _logger.error(f"[{self._name}]: Unable to fetch the {topic} snapshot")
+                _logger.exception(e)
+            else:
+                seq = result.get("seq_number")
+                buffer = self._resync_buffers[path]
+                if not self._is_stale_snapshot(
+                    seq, buffer, self._resync_overflows[path]
+                ):
+                    break
+                metrics["stale_snapshots"] += 1
+                _logger.warning(
+                    f"[{self._name}]: The {topic} snapshot {seq=} is older than "
+                    f"the buffered deltas, requesting it again"
+                )
+            await asyncio.sleep(delay)
+            delay = min(2 * delay, self._max_reconnect_delay)
+
+        book = self._orderbooks[path]
+        buffer = self._resync_buffers.pop(path)
+        self._resync_overflows.pop(path, None)
+        self._resync_tasks.pop(path, None)
+        book.apply_snapshot(
+            [[level["price"], level["volume"]] for level in result["bids"]],
+            [[level["price"], level["volume"]] for level in result["asks"]],
+            None,
+            seq,
+            result.get("engine_timestamp"),
+        )
+        replayed = 0
+        for message in buffer:
+            data = message["data"]
+            if seq is None or data.get("seq", seq + 1) > seq:
+                book.apply_delta(
+                    data["b"], data["a"], data["u"], data.get("seq"), message["ts"]
+                )
+                replayed += 1
+        # The stream continues from the last buffered delta
+        book.update_id = buffer[-1]["data"]["u"]
+
+        elapsed = time.perf_counter() - start
+        metrics["resyncs"] += 1
+        metrics["last_time"] = elapsed
+        metrics["max_time"] = max(metrics["max_time"], elapsed)
+        _logger.info(
+            f"[{self._name}]: Resynchronised {path} in {elapsed:.3f}s, "
+            f"replayed {replayed}/{len(buffer)} buffered deltas"
+        )
+
+    @staticmethod
+    def _is_stale_snapshot(seq: int | None, buffer: deque, overflowed: bool) -> bool:
+        """Whether deltas are missing between a REST snapshot and the first
+        buffered delta. Without sequence numbers to compare, only a buffer
+        overflow during the request makes the snapshot stale.
+        """
+        first = buffer[0]["data"].get("seq")
+        if seq is None or first is None:
+            return overflowed
+        return seq < first - 1
+
+    @overrides(Exchange)
+    def get_resync_metrics(self) -> Dict[str, Dict[str, float]]:
+        """Orderbook resynchronisation metrics per topic and endpoint, ex.
+        orderbook.50.BTCUSDT/v5/public/linear: number of gaps,
+        successful resyncs, failed snapshot requests, snapshots requested
+        again because they were stale, resync buffer overflows and the last
+        and maximum resync times in seconds.
+        """
+        return {k: dict(v) for k, v in self._resyncs.items()}
+
+    @overrides(Exchange)
+    def get_orderbook_depths(self) -> Dict[str, Dict[str, int | None]]:
+        """Retained depth of the local orderbooks per topic and endpoint, ex.
+        orderbook.50.BTCUSDT/v5/public/linear: number of bid and ask levels
+        held, the `max_depth` they are trimmed to and the number of levels
+        trimmed so far.
+        """
+        return {
+            path: {
+                "bids": len(book.bids),
+                "asks": len(book.asks),
+                "max_depth": book.max_depth,
+                "trimmed": book.trimmed,
+            }
+            for path, book in self._orderbooks.items()
+        }
+
+    @overrides(Exchange)
+    def get_orderbook(
+        self, *, symbol: str, depth: int, category: str | None = None
+    ) -> OrderBook | None:
+        """Returns the local orderbook maintained for a `stream_orderbook`
+        subscription with delta handling, None if there is none. Its
+        analytics (`imbalance`, `microprice`, `vwap`...) are up to date with
+        the last message received. The `category` is required when the symbol
+        is streamed in several categories.
+        """
+        topic = f"orderbook.{depth}.{symbol.upper()}"
+        return self._find_topic_state(self._orderbooks, topic, category)
+
+    def _find_topic_state(
+        self, states: Dict[str, Any], topic: str, category: str | None
+    ) -> Any:
+        """Returns the state kept for `topic` on the endpoint of `category`, on
+        its only endpoint when `category` is None.
+        """
+        if category is not None:
+            return states.get(f"{topic}{self.public_endpoint}/{category}")
+        found = [
+            state for path, state in states.items() if path.split("/", 1)[0] == topic
+        ]
+        if len(found) > 1:
+            raise ValueError(f"{topic} is streamed in several categories")
+        return found[0] if found else None
 
     @overrides(Exchange)
     @staticmethod
@@ -3,6 +3,11 @@ import logging
 _logger = logging.getLogger(__name__)
 
 
+def _number(value):
+    """Prices and volumes are either exchange strings or integer ticks/lots."""
+    return value if isinstance(value, int) else float(value)
+
+
 def write_headers(depth, trades_file, quotes_file, events_file):
     quotes_file.write(quote_headers(depth))
     quotes_file.write("\n")
@@ -31,8 +36,8 @@ def process_trade(trade):
             trade["symbol"],
             str(trade["engine_timestamp"]),
             str(trade["side"] == "Buy" and 1 or -1),
-            trade["price"],
-            trade["volume"],
+            str(trade["price"]),
+            str(trade["volume"]),
         )
     )
 
@@ -60,10 +65,10 @@ def process_quote(message, depth):
     ask_q = [d["volume"] for d in ask_data]
 
     quotes = f"{ts},{symbol}"
-    quotes = f"{quotes},{','.join(bid_p)}"
-    quotes = f"{quotes},{','.join(ask_p)}"
-    quotes = f"{quotes},{','.join(bid_q)}"
-    quotes = f"{quotes},{','.join(ask_q)}"
+    quotes = f"{quotes},{','.join(map(str, bid_p))}"
+    quotes = f"{quotes},{','.join(map(str, ask_p))}"
+    quotes = f"{quotes},{','.join(map(str, bid_q))}"
+    quotes = f"{quotes},{','.join(map(str, ask_q))}"
 
     return quotes
 
@@ -92,12 +97,12 @@ def process_event(depth, event):
         [
             str(event["timestamp"]),
             event["symbol"],
-            ",".join(bid_p),
-            ",".join(ask_p),
+            ",".join(map(str, bid_p)),
+            ",".join(map(str, ask_p)),
             ",".join(bid_e),
             ",".join(ask_e),
-            ",".join(bid_s),
-            ",".join(ask_s),
+            ",".join(map(str, bid_s)),
+            ",".join(map(str, ask_s)),
         ]
     )
 
@@ -151,11 +156,13 @@ def write_quote(
                     if trade_side == side:
                         price = trade["price"]
                         if price in previous_quotes:
-                            old_volume = float(previous_quotes[price])
-                            vol_diff = old_volume - float(trade["volume"])
+                            old_volume = _number(previous_quotes[price])
+                            vol_diff = old_volume - _number(trade["volume"])
                             if vol_diff == 0:
                                 # The price/volume is not needed
                                 del previous_quotes[price]
+                            elif isinstance(vol_diff, int):
+                                previous_quotes[price] = vol_diff
                             else:
                                 previous_quotes[price] = str(vol_diff)
                         else:
@@ -178,8 +185,9 @@ def write_quote(
             for quote in quotes:
                 price = quote["price"]
                 volume = quote["volume"]
-                if volume == "0":
-                    if price in previous_quotes and float(previous_quotes[price]) != 0:
+                if _number(volume) == 0:
+                    previous_volume = previous_quotes.get(price, 0)
+                    if price in previous_quotes and _number(previous_volume) != 0:
                         event[side][price] = [price, "C", f"-{previous_quotes[price]}"]
                         del previous_quotes[price]
                     else:
@@ -188,7 +196,8 @@ def write_quote(
                             f"with a volume=0. Event with {uid=}"
                         )
                 else:
-                    volume_diff = float(previous_quotes.get(price, 0)) - float(volume)
+                    previous_volume = _number(previous_quotes.get(price, 0))
+                    volume_diff = previous_volume - _number(volume)
                     if volume_diff > 0:
                         # add cancel
                         event[side][price] = [price, "C", f"-{volume}"]
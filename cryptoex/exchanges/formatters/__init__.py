@@ -1,4 +1,7 @@
 from typing import Any, Dict, TypeAlias, List
+from cryptoex.orderbook import OrderBook
+from cryptoex.ticks import TickScale
+from cryptoex.exchanges.records import QuoteRecord, TradeRecord, CandleRecord
 
 Timestamp: TypeAlias = float
 
@@ -65,3 +68,30 @@ class AbstractFormatter:
         wallet_accounts: List[Dict[str, Any]],
     ) -> Dict[str, Dict[str, Any]]:
         return wallet_accounts
+
+    @staticmethod
+    def to_quote_record(
+        message: Dict[str, Any],
+        book: OrderBook | None = None,
+        scale: TickScale | None = None,
+    ) -> QuoteRecord:
+        """Decode an orderbook snapshot or delta message into a `QuoteRecord`
+        with prices and volumes parsed as floats, or as ticks and lots with a
+        `scale`. When the local `book` the message was applied to is given,
+        the record is a snapshot of the book.
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def to_trade_records(
+        message: Dict[str, Any], scale: TickScale | None = None
+    ) -> List[TradeRecord]:
+        """Decode a trades message into a list of `TradeRecord`, with prices
+        and volumes as ticks and lots when a `scale` is given.
+        """
+        raise NotImplementedError()
+
+    @staticmethod
+    def to_candle_records(message: Dict[str, Any]) -> List[CandleRecord]:
+        """Decode a candlesticks message into a list of `CandleRecord`."""
+        raise NotImplementedError()
@@ -5,7 +5,10 @@ from datetime import datetime
 
 from typing import Dict, Any, List
 from cryptoex.utils import assign_dtypes
+from cryptoex.orderbook import OrderBook
+from cryptoex.ticks import TickScale
 from cryptoex.exchanges.formatters import AbstractFormatter, Timestamp
+from cryptoex.exchanges.records import QuoteRecord, TradeRecord, CandleRecord
 
 
 class BybitFormatter(AbstractFormatter):
@@ -62,6 +65,74 @@ class BybitFormatter(AbstractFormatter):
         data["topic"] = message["topic"]
         return data["trades"]
 
+    @staticmethod
+    def to_quote_record(
+        message: Dict[str, Any],
+        book: OrderBook | None = None,
+        scale: TickScale | None = None,
+    ) -> QuoteRecord:
+        data = message["data"]
+        if book is None and scale is not None:
+            bids, asks = scale.to_levels(data["b"]), scale.to_levels(data["a"])
+        elif book is None:
+            bids = [(float(p), float(v)) for p, v in data["b"]]
+            asks = [(float(p), float(v)) for p, v in data["a"]]
+        else:
+            bids, asks = book.bids.levels(), book.asks.levels()
+        return QuoteRecord(
+            topic=message["topic"],
+            symbol=data["s"],
+            is_snapshot=book is not None or message["type"] == "snapshot",
+            engine_timestamp=message["ts"],
+            matching_timestamp=message.get("cts", message["ts"]),
+            update_id=data["u"],
+            seq_id=data.get("seq", 0),
+            bids=bids,
+            asks=asks,
+        )
+
+    @staticmethod
+    def to_trade_records(
+        message: Dict[str, Any], scale: TickScale | None = None
+    ) -> List[TradeRecord]:
+        if scale is None:
+            to_price = to_volume = float
+        else:
+            to_price, to_volume = scale.to_ticks, scale.to_lots
+        return [
+            TradeRecord(
+                trade_id=trade["i"],
+                symbol=trade["s"],
+                timestamp=trade["T"],
+                side=1 if trade["S"] == "Buy" else -1,
+                price=to_price(trade["p"]),
+                volume=to_volume(trade["v"]),
+                is_block_trade=trade["BT"],
+            )
+            for trade in message["data"]
+        ]
+
+    @staticmethod
+    def to_candle_records(message: Dict[str, Any]) -> List[CandleRecord]:
+        symbol = message["topic"].rsplit(".", 1)[-1]
+        return [
+            CandleRecord(
+                symbol=symbol,
+                bar_size=candle["interval"],
+                start=candle["start"],
+                end=candle["end"],
+                open=float(candle["open"]),
+                high=float(candle["high"]),
+                low=float(candle["low"]),
+                close=float(candle["close"]),
+                volume=float(candle["volume"]),
+                turnover=float(candle["turnover"]),
+                confirmed=candle["confirm"],
+                timestamp=candle["timestamp"],
+            )
+            for candle in message["data"]
+        ]
+
     @staticmethod
     def format_announcements(
         announcements: Dict[str, Any], last_updated: Timestamp = 0
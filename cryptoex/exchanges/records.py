@@ -0,0 +1,64 @@
+"""Compact typed records for market data pushes.
+
+Records are built by the exchange formatters straight from the decoded
+messages with their numeric fields already parsed, so consumers do not have
+to walk nested dicts or convert price strings again. Prices and volumes are
+integer ticks and lots when the stream is decoded with a `TickScale`.
+"""
+
+from dataclasses import dataclass
+from typing import List, Tuple
+
+Level = Tuple[float, float]
+
+
+@dataclass(slots=True)
+class QuoteRecord:
+    topic: str
+    symbol: str
+    is_snapshot: bool
+    engine_timestamp: int
+    matching_timestamp: int
+    update_id: int
+    seq_id: int
+    bids: List[Level]
+    asks: List[Level]
+
+
+@dataclass(slots=True)
+class BBORecord:
+    topic: str
+    symbol: str
+    timestamp: int
+    update_id: int
+    bid_price: float | None  # None when the side is empty
+    bid_size: float | None
+    ask_price: float | None
+    ask_size: float | None
+
+
+@dataclass(slots=True)
+class TradeRecord:
+    trade_id: str
+    symbol: str
+    timestamp: int
+    side: int  # 1 for a buy, -1 for a sell
+    price: float
+    volume: float
+    is_block_trade: bool
+
+
+@dataclass(slots=True)
+class CandleRecord:
+    symbol: str
+    bar_size: str
+    start: int
+    end: int
+    open: float
+    high: float
+    low: float
+    close: float
+    volume: float
+    turnover: float
+    confirmed: bool
+    timestamp: int
@@ -1,12 +1,13 @@
 import os
-import json
+import copy
 import yaml
+import asyncio
 import logging
 from pathlib import Path
 from functools import wraps
 from datetime import datetime
 from pydantic.dataclasses import dataclass
-from typing import Any, Dict, List
+from typing import Any, AsyncIterator, Awaitable, Callable, Dict, List
 from cryptoex import settings
 from cryptoex.exceptions import ExchangeError
 
@@ -158,6 +159,7 @@ def handle_requests(
     use_defaults: bool = True,
     filepath: str = "rest-api",
     filename: str = None,
+    ttl: float | None = None,
     logger: logging.Logger | Any = _logger,
 ):
     """Decorator that does 3 things:
@@ -166,6 +168,10 @@ def handle_requests(
     2. Checks that all the required arguments are set.
     3. Transforms the output and remap it to the standard
     mapping from the exchange mapping.
+
+    When `ttl` is set, successful responses are kept in the response cache of
+    the exchange for `ttl` seconds and identical requests are answered from
+    it, see `ResponseCache`.
     """
 
     filename = filename or attribute
@@ -187,18 +193,36 @@ def handle_requests(
             params = build_params(mapping, **kwargs)
 
             ept = getattr(self.endpoints, endpoint)
-            result = await self.request(
-                method=method, endpoint=ept, params=params, private=private
-            )
-            success, error_code, error_message = self.validate_http_response(result)
-            if not success:
-                _logger.error(
-                    f"Request to {ept} failed. {error_code=}, {error_message=}"
+            cache = self._response_cache
+            cache_ttl = cache.ttl(endpoint, ttl) if cache is not None else None
+            result = None
+            if cache_ttl:
+                scope = self._key if private else ""
+                cache_key = cache.key(method, ept, params, scope)
+                result = cache.get(cache_key)
+            cached = result is not None
+            if cached:
+                logger.info(f"Using the cached response of {ept} for {params=}")
+                # The output mapping keeps nested lists, the caller must not
+                # be able to modify the cached response through them
+                result = copy.deepcopy(result)
+            else:
+                result = await self.request(
+                    method=method, endpoint=ept, params=params, private=private
+                )
+                success, error_code, error_message = self.validate_http_response(
+                    result
                 )
-                raise ExchangeError(error_message)
+                if not success:
+                    _logger.error(
+                        f"Request to {ept} failed. {error_code=}, {error_message=}"
+                    )
+                    raise ExchangeError(error_message, code=error_code)
+                if cache_ttl:
+                    cache.set(cache_key, copy.deepcopy(result), cache_ttl)
 
             # Dump raw data for backup
-            if self.auto_dump:
+            if self.auto_dump and not cached:
                 datestr = datetime.today().strftime("%Y-%m-%d")
                 source_dir = os.path.join(
                     settings.REST_DIR, self.name, filepath, datestr
@@ -210,7 +234,7 @@ def handle_requests(
                 fullpath = os.path.join(source_dir, file)
                 logger.info(f"Dumping data to {fullpath}")
                 with open(fullpath, "w") as f:
-                    json.dump(result, f)
+                    f.write(self._codec.dumps(result))
 
             if not mapping:
                 raise ValueError(f"Mapping missing for {self.__name__}@{endpoint=}")
@@ -230,6 +254,51 @@ def handle_requests(
     return wrap
 
 
+async def paginate(
+    fetch: Callable[..., Awaitable[Dict[str, Any]]],
+    params: Dict[str, Any],
+    next_params: Callable[[Dict[str, Any], Dict[str, Any]], Dict[str, Any] | None],
+) -> AsyncIterator[Dict[str, Any]]:
+    """Yields the pages returned by `fetch(**params)`, the request of the next
+    page being sent before the current page is yielded so that it downloads
+    while the caller processes the current one.
+
+    Parameters
+    ----------
+
+    fetch: coroutine function
+        Requests a page, ex: `fetch_instruments_details`.
+
+    params: dict
+        The keyword arguments of the first page.
+
+    next_params: callable
+        Given a page and the keyword arguments that requested it, returns the
+        keyword arguments of the next page, None after the last page.
+    """
+    task = asyncio.ensure_future(fetch(**params))
+    try:
+        while task is not None:
+            page = await task
+            params = next_params(page, params)
+            task = None if params is None else asyncio.ensure_future(fetch(**params))
+            yield page
+    finally:
+        # The caller stopped early, the next page is not needed
+        if task is not None and not task.cancel() and not task.cancelled():
+            task.exception()
+
+
+def next_cursor_params(
+    page: Dict[str, Any], params: Dict[str, Any]
+) -> Dict[str, Any] | None:
+    """`next_params` of the endpoints paginated by a cursor."""
+    cursor = page.get("next_page_cursor")
+    if not cursor:
+        return None
+    return {**params, "cursor": cursor}
+
+
 def callback_mapper(
     *,
     attribute: str,
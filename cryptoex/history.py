@@ -0,0 +1,231 @@
+"""Bulk download of historical candlesticks.
+
+The kline endpoint returns at most `limit` bars per request. A date range is
+split into windows of `limit` bars that are requested concurrently, within
+the rate limits of the exchange, then the bars are de-duplicated, sorted by
+time and stored as Arrow tables, optionally written to Parquet or Arrow IPC
+(feather) files.
+"""
+
+import os
+import asyncio
+import logging
+from datetime import datetime
+from typing import Any, Dict, Iterable, List, Tuple
+
+import httpx
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+import pyarrow.parquet as pq
+
+from cryptoex.exceptions import ExchangeError
+from cryptoex.exchanges.bars import interval_ms
+
+_logger = logging.getLogger(__name__)
+
+# Months are split as if they lasted 28 days, so that a window never holds
+# more than `limit` bars
+_MONTH_MS = 28 * 86_400_000
+
+CANDLE_FIELDS = ("open", "high", "low", "close", "volume", "turnover")
+
+CANDLE_SCHEMA = pa.schema(
+    [("time", pa.timestamp("ms", tz="UTC"))]
+    + [(field, pa.float64()) for field in CANDLE_FIELDS]
+)
+
+
+def to_ms(value: int | str | datetime) -> int:
+    """Milliseconds since the epoch of a timestamp in milliseconds, a
+    datetime or a date string, naive values being UTC.
+    """
+    if isinstance(value, int):
+        return value
+    return pd.Timestamp(value).value // 1_000_000
+
+
+def candle_windows(
+    start: int, end: int, bar_size: int | str, limit: int = 1000
+) -> List[Tuple[int, int]]:
+    """Splits [start, end] (milliseconds, both included) into consecutive
+    windows of at most `limit` bars.
+    """
+    length = _MONTH_MS if str(bar_size) == "M" else interval_ms(bar_size)
+    step = length * limit
+    return [(s, min(s + step - 1, end)) for s in range(start, end + 1, step)]
+
+
+class CandleDownloader:
+    """Downloads the candlesticks of symbols over a date range.
+
+    The windows of the symbols being downloaded are requested as soon as one
+    of the `max_concurrency` slots is free. The requests also wait for the
+    rate limiter of the exchange, if any. A request that failed with a
+    transient error (timeout, rate limit, server error, see
+    `is_transient_error`) is retried `retries` times with an exponential
+    backoff. Any other error fails the download of the symbol at once.
+
+    Parameters
+    ----------
+
+    exchange: Exchange
+        Used to send the requests with `fetch_candlesticks`.
+
+    category: str
+        The category of the symbols: spot, linear, inverse, option
+
+    bar_size: str
+        The interval of the bars: 1,3,5,15,30,60,120,240,360,720,D,M,W
+
+    limit: int
+        Number of bars per request, 1000 at most for Bybit.
+
+    max_concurrency: int
+        Maximum number of requests in flight.
+
+    retries: int
+        Number of retries of a request that failed with a transient error.
+    """
+
+    def __init__(
+        self,
+        exchange: Any,
+        category: str,
+        bar_size: int | str,
+        *,
+        limit: int = 1000,
+        max_concurrency: int = 8,
+        retries: int = 3,
+    ):
+        self.exchange = exchange
+        self.category = category
+        self.bar_size = str(bar_size)
+        self.limit = limit
+        self.retries = retries
+        self._semaphore = asyncio.Semaphore(max_concurrency)
+
+    async def _fetch_window(
+        self, symbol: str, start: int, end: int
+    ) -> List[Dict[str, Any]]:
+        async with self._semaphore:
+            for attempt in range(self.retries + 1):
+                try:
+                    result = await self.exchange.fetch_candlesticks(
+                        category=self.category,
+                        symbol=symbol,
+                        bar_size=self.bar_size,
+                        start=start,
+                        end=end,
+                        limit=self.limit,
+                    )
+                    return result["bars"]
+                except (ExchangeError, httpx.HTTPError) as error:
+                    transient = self.exchange.is_transient_error(error)
+                    if attempt == self.retries or not transient:
+                        raise
+                    delay = 2**attempt
+                    _logger.warning(
+                        f"Retrying the bars of {symbol} in [{start}, {end}] "
+                        f"in {delay}s: {error!r}"
+                    )
+                    await asyncio.sleep(delay)
+
+    async def download_symbol(
+        self, symbol: str, start: int | str | datetime, end: int | str | datetime
+    ) -> pa.Table:
+        """The bars of `symbol` starting in [start, end], sorted by time."""
+        start, end = to_ms(start), to_ms(end)
+        windows = candle_windows(start, end, self.bar_size, self.limit)
+        tasks = [
+            asyncio.create_task(self._fetch_window(symbol, *window))
+            for window in windows
+        ]
+        try:
+            pages = await asyncio.gather(*tasks)
+        except BaseException:
+            # The symbol failed: the pending windows would be thrown away
+            for task in tasks:
+                task.cancel()
+            await asyncio.gather(*tasks, return_exceptions=True)
+            raise
+        # Windows may overlap at their bounds
+        bars = {}
+        for page in pages:
+            for bar in page:
+                bars[int(bar["time"])] = bar
+        times = sorted(t for t in bars if start <= t <= end)
+        columns = [pa.array(times, pa.int64()).cast(CANDLE_SCHEMA.field("time").type)]
+        for field in CANDLE_FIELDS:
+            columns.append(
+                pa.array([float(bars[t][field]) for t in times], pa.float64())
+            )
+        _logger.info(
+            f"Downloaded {len(times)} {self.bar_size} bars of {symbol} "
+            f"with {len(windows)} requests"
+        )
+        return pa.Table.from_arrays(columns, schema=CANDLE_SCHEMA)
+
+    async def download(
+        self,
+        symbols: Iterable[str],
+        start: int | str | datetime,
+        end: int | str | datetime,
+    ) -> Dict[str, pa.Table]:
+        """The bars of every symbol, see `download_symbol`."""
+        symbols = list(symbols)
+        tables = await asyncio.gather(
+            *(self.download_symbol(symbol, start, end) for symbol in symbols)
+        )
+        return dict(zip(symbols, tables))
+
+    async def download_to(
+        self,
+        directory: str,
+        symbols: Iterable[str],
+        start: int | str | datetime,
+        end: int | str | datetime,
+        format: str = "parquet",
+        max_symbols: int = 4,
+    ) -> Dict[str, str | Exception]:
+        """Writes the bars of every symbol to `directory`, in a
+        {symbol}-{bar_size}.parquet or .arrow file. Unlike `download`, only
+        `max_symbols` symbols are downloaded at a time and the table of a
+        symbol is written before the next symbol starts, so that at most
+        `max_symbols` tables are held in memory.
+
+        returns
+        -------
+            The path of the file of every symbol, or the error that made its
+            download fail, once the other symbols are written.
+        """
+        if format not in ("parquet", "arrow"):
+            raise ValueError(f"Unsupported {format=}, use parquet or arrow")
+        if max_symbols < 1:
+            raise ValueError(f"{max_symbols=} must be a positive integer")
+        os.makedirs(directory, exist_ok=True)
+
+        def write(symbol: str, table: pa.Table) -> str:
+            path = os.path.join(directory, f"{symbol}-{self.bar_size}.{format}")
+            if format == "parquet":
+                pq.write_table(table, path)
+            else:
+                feather.write_feather(table, path)
+            return path
+
+        symbols = list(symbols)
+        results: Dict[str, str | Exception] = {}
+        pending = iter(symbols)
+
+        async def worker():
+            # Workers share the iterator, each symbol is taken once
+            for symbol in pending:
+                try:
+                    table = await self.download_symbol(symbol, start, end)
+                    results[symbol] = write(symbol, table)
+                except Exception as error:
+                    _logger.error(f"Could not download the bars of {symbol}: {error!r}")
+                    results[symbol] = error
+
+        await asyncio.gather(*(worker() for _ in range(min(max_symbols, len(symbols)))))
+        return {symbol: results[symbol] for symbol in symbols}
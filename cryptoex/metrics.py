@@ -0,0 +1,69 @@
+"""Lightweight runtime metrics kept by the connection managers."""
+
+import bisect
+from collections import deque
+from typing import Dict, Any, Sequence
+
+# Upper bounds of the latency buckets in seconds
+LATENCY_BUCKETS = (0.001, 0.002, 0.005, 0.01, 0.02, 0.05, 0.1, 0.2, 0.5, 1.0)
+
+
+class RollingHistogram:
+    """Keeps the last `size` samples and summarises them on demand.
+
+    Adding a sample is O(1), the summary is computed when queried.
+
+    Parameters
+    ----------
+
+    size: int
+        Number of samples kept in the rolling window.
+
+    buckets: sequence
+        Sorted upper bounds of the histogram buckets. An extra bucket
+        collects the samples above the last bound.
+    """
+
+    def __init__(self, size: int = 1000, buckets: Sequence[float] = LATENCY_BUCKETS):
+        self._samples = deque(maxlen=size)
+        self._buckets = tuple(buckets)
+
+    def add(self, value: float) -> None:
+        self._samples.append(value)
+
+    def __len__(self) -> int:
+        return len(self._samples)
+
+    @property
+    def last(self) -> float | None:
+        return self._samples[-1] if self._samples else None
+
+    def quantile(self, q: float) -> float | None:
+        if not self._samples:
+            return None
+        samples = sorted(self._samples)
+        return samples[min(len(samples) - 1, int(q * len(samples)))]
+
+    def histogram(self) -> Dict[str, int]:
+        counts = [0] * (len(self._buckets) + 1)
+        for value in self._samples:
+            counts[bisect.bisect_left(self._buckets, value)] += 1
+        labels = [f"<={b}" for b in self._buckets] + [f">{self._buckets[-1]}"]
+        return dict(zip(labels, counts))
+
+    def summary(self) -> Dict[str, Any]:
+        samples = sorted(self._samples)
+        n = len(samples)
+        if n == 0:
+            return {"count": 0}
+        return {
+            "count": n,
+            "last": self._samples[-1],
+            "min": samples[0],
+            "mean": sum(samples) / n,
+            "p50": samples[int(0.5 * n)],
+            "p90": samples[min(n - 1, int(0.9 * n))],
+            "p99": samples[min(n - 1, int(0.99 * n))],
+            "max": samples[-1],
+            "histogram": self.histogram(),
+        }
@@ -0,0 +1,694 @@
+"""Local L2 order book maintained from exchange snapshots and deltas.
+
+Price levels are kept sorted best first on both sides, so a delta only
+touches the levels it carries: each level is located by bisection and the
+book is never rebuilt. Views (best bid/ask, top-N levels, full snapshots)
+are materialised on demand, either as lists or written into preallocated
+NumPy arrays with `OrderBookArrays`, or mirrored into arrays on every
+update with `BookSide.mirror`. `SharedBookPublisher` writes them into
+shared memory for readers in other processes (`SharedBookReader`).
+
+With a `TickScale`, prices and sizes are kept as integer ticks and lots
+instead of floats.
+"""
+
+import time
+from bisect import bisect_left
+from multiprocessing.shared_memory import SharedMemory
+from typing import Dict, Iterable, List, Sequence, Tuple
+
+import numpy as np
+
+from cryptoex.ticks import TickScale
+
+Level = Tuple[float, float]
+
+
+class BookSide:
+    """One side of the book.
+
+    Prices are stored signed in an ascending list (negated for the bids) so
+    that index 0 is always the best level, with the sizes in a list aligned
+    on it: the best levels are slices of both lists. The raw strings sent by
+    the exchange are kept per price, which lets the book be written back
+    exactly as received.
+
+    With `top_levels`, the total size and notional of the `top_levels` best
+    levels are maintained as levels change: an update only adjusts them by
+    the level it touches and, on insertion or removal, the level crossing the
+    boundary. Without a `scale` these are float sums whose rounding errors
+    would add up over the deltas: they are recomputed from the levels on
+    every snapshot and after every `resum_interval` adjustments. Likewise,
+    arrays attached with `mirror` are kept equal to the output of `fill` by
+    shifting only the levels behind an inserted or removed one.
+
+    Parameters
+    ----------
+
+    descending: bool
+        True for the bids, whose best level is the highest price.
+
+    scale: TickScale
+        When given, prices and sizes are stored as integer ticks and lots.
+
+    top_levels: int
+        Number of best levels whose total size and notional are maintained.
+    """
+
+    __slots__ = (
+        "_sign",
+        "_keys",
+        "_sizes",
+        "_levels",
+        "_price",
+        "_size",
+        "top_levels",
+        "top_size",
+        "top_notional",
+        "_top_updates",
+        "_resum_every",
+        "_mirror_prices",
+        "_mirror_sizes",
+        "_mirror_depth",
+    )
+
+    # Number of adjustments of the float top sums after which they are
+    # recomputed from the levels
+    resum_interval = 1024
+
+    def __init__(
+        self, descending: bool, scale: TickScale | None = None, top_levels: int = 0
+    ):
+        self._sign = -1 if descending else 1
+        self._keys: List[float] = []
+        self._sizes: List[float] = []
+        self._levels: Dict[float, List[str]] = {}
+        self._price = scale.to_ticks if scale else float
+        self._size = scale.to_lots if scale else float
+        self.top_levels = top_levels
+        self.top_size = 0
+        self.top_notional = 0
+        self._top_updates = 0
+        # Integer sums are exact and never recomputed
+        self._resum_every = float("inf") if scale else self.resum_interval
+        self._mirror_prices = self._mirror_sizes = None
+        self._mirror_depth = 0
+
+    def __len__(self) -> int:
+        return len(self._keys)
+
+    def __contains__(self, price: float) -> bool:
+        return price in self._levels
+
+    def clear(self) -> None:
+        self._keys.clear()
+        self._sizes.clear()
+        self._levels.clear()
+        self.top_size = self.top_notional = 0
+        self._top_updates = 0
+        if self._mirror_depth:
+            self._mirror_prices[:] = np.nan
+            self._mirror_sizes[:] = 0.0
+
+    def load(self, levels: Iterable[Sequence[str]]) -> None:
+        """Replaces the side with the levels of a snapshot."""
+        self.clear()
+        to_price, to_size, sign = self._price, self._size, self._sign
+        book = []
+        for price, size in levels:
+            volume = to_size(size)
+            if volume:
+                value = to_price(price)
+                self._levels[value] = [price, size]
+                book.append((sign * value, volume))
+        book.sort()
+        self._keys.extend(key for key, _ in book)
+        self._sizes.extend(volume for _, volume in book)
+        self._sum_top()
+        if self._mirror_depth:
+            self.fill(self._mirror_prices, self._mirror_sizes)
+
+    def mirror(self, prices: np.ndarray, sizes: np.ndarray) -> None:
+        """Keeps `prices` and `sizes` filled with the best levels, as written
+        by `fill`, on every update.
+        """
+        self._mirror_prices = prices
+        self._mirror_sizes = sizes
+        self._mirror_depth = len(prices)
+        self.fill(prices, sizes)
+
+    def update(self, price: str, size: str) -> None:
+        """Sets the size of a level, a size of 0 removes the level."""
+        if self._top_updates >= self._resum_every:
+            self._sum_top()
+        value = self._price(price)
+        volume = self._size(size)
+        levels = self._levels
+        keys = self._keys
+        n = self.top_levels
+        if volume == 0:
+            if levels.pop(value, None) is not None:
+                index = bisect_left(keys, self._sign * value)
+                del keys[index]
+                removed = self._sizes.pop(index)
+                if index < n:
+                    self._add_top(value, -removed)
+                    if len(keys) >= n:
+                        # The next level enters the top levels
+                        self._add_top(self._sign * keys[n - 1], self._sizes[n - 1])
+                if index < self._mirror_depth:
+                    self._mirror_remove(index)
+            return
+
+        key = self._sign * value
+        index = bisect_left(keys, key)
+        if value in levels:
+            if index < n:
+                self._add_top(value, volume - self._sizes[index])
+            self._sizes[index] = volume
+            if index < self._mirror_depth:
+                self._mirror_sizes[index] = volume
+        else:
+            keys.insert(index, key)
+            self._sizes.insert(index, volume)
+            if index < n:
+                self._add_top(value, volume)
+                if len(keys) > n:
+                    # The last top level is pushed out
+                    self._add_top(self._sign * keys[n], -self._sizes[n])
+            if index < self._mirror_depth:
+                self._mirror_insert(index, value, volume)
+        levels[value] = [price, size]
+
+    def _mirror_insert(self, index: int, price: float, volume: float) -> None:
+        prices, sizes = self._mirror_prices, self._mirror_sizes
+        prices[index + 1 :] = prices[index:-1]
+        sizes[index + 1 :] = sizes[index:-1]
+        prices[index] = price
+        sizes[index] = volume
+
+    def _mirror_remove(self, index: int) -> None:
+        prices, sizes = self._mirror_prices, self._mirror_sizes
+        prices[index:-1] = prices[index + 1 :]
+        sizes[index:-1] = sizes[index + 1 :]
+        last = self._mirror_depth - 1
+        if len(self._keys) > last:
+            # The next level enters the arrays
+            prices[last] = self._sign * self._keys[last]
+            sizes[last] = self._sizes[last]
+        else:
+            prices[last] = np.nan
+            sizes[last] = 0.0
+
+    def truncate(self, depth: int) -> int:
+        """Removes the levels beyond the `depth` best ones.
+
+        returns
+        -------
+            The number of levels removed.
+        """
+        keys = self._keys
+        removed = len(keys) - depth
+        if removed <= 0:
+            return 0
+        sign = self._sign
+        levels = self._levels
+        for index in range(depth, len(keys)):
+            price = sign * keys[index]
+            del levels[price]
+            if index < self.top_levels:
+                self._add_top(price, -self._sizes[index])
+        del keys[depth:]
+        del self._sizes[depth:]
+        if depth < self._mirror_depth:
+            self.fill(self._mirror_prices, self._mirror_sizes)
+        return removed
+
+    def _add_top(self, price: float, volume: float) -> None:
+        self.top_size += volume
+        self.top_notional += price * volume
+        self._top_updates += 1
+
+    def _sum_top(self) -> None:
+        """Recomputes the total size and notional of the top levels."""
+        n = self.top_levels
+        sizes = self._sizes[:n]
+        self.top_size = sum(sizes)
+        self.top_notional = self._sign * sum(
+            key * volume for key, volume in zip(self._keys[:n], sizes)
+        )
+        self._top_updates = 0
+
+    def best(self) -> Level | None:
+        if not self._keys:
+            return None
+        return self._sign * self._keys[0], self._sizes[0]
+
+    def levels(self, n: int | None = None) -> List[Level]:
+        """The `n` best levels as (price, size), all of them by default."""
+        sign = self._sign
+        return [
+            (sign * key, volume)
+            for key, volume in zip(self._keys[:n], self._sizes[:n])
+        ]
+
+    def vwap(self, size: float) -> float | None:
+        """Average price paid to take `size` from this side, walking the levels
+        from the best one. None if the side holds less than `size`.
+        """
+        sign = self._sign
+        remaining = size
+        notional = 0
+        for key, volume in zip(self._keys, self._sizes):
+            price = sign * key
+            if volume >= remaining:
+                return (notional + price * remaining) / size
+            notional += price * volume
+            remaining -= volume
+        return None
+
+    def fill(self, prices: np.ndarray, sizes: np.ndarray) -> int:
+        """Writes the best levels into `prices` and `sizes` up to their length.
+        The remaining slots are set to NaN and 0. Returns the number of levels
+        written.
+        """
+        depth = len(prices)
+        keys = self._keys[:depth]
+        n = len(keys)
+        prices[:n] = keys
+        if self._sign < 0:
+            np.negative(prices[:n], out=prices[:n])
+        sizes[:n] = self._sizes[:depth]
+        if n < depth:
+            prices[n:] = np.nan
+            sizes[n:] = 0.0
+        return n
+
+    def raw(self, n: int | None = None) -> List[List[str]]:
+        """The `n` best levels as [price, size] strings, as sent by the
+        exchange.
+        """
+        sign = self._sign
+        levels = self._levels
+        return [levels[sign * key] for key in self._keys[:n]]
+
+
+class OrderBook:
+    """L2 order book of a symbol.
+
+    Snapshots replace the book, deltas update it in place. Locating a level
+    is O(log n), inserting or removing one only shifts the signed price
+    list.
+
+    Parameters
+    ----------
+
+    symbol: str
+        The symbol of the book.
+
+    scale: TickScale
+        When given, prices and sizes are integer ticks and lots.
+
+    top_levels: int
+        Number of best levels over which the cumulative depth, imbalance and
+        depth VWAP are maintained incrementally. Exact with a `scale`, float
+        sums recomputed every `BookSide.resum_interval` adjustments
+        otherwise.
+
+    max_depth: int
+        When given, the levels beyond the `max_depth` best ones of each side
+        are dropped after every snapshot and delta, which bounds the memory
+        of the book. `trimmed` counts the levels dropped.
+
+    `valid` is False from the time a gap is detected in the updates until
+    the book is rebuilt from a snapshot.
+    """
+
+    __slots__ = (
+        "symbol",
+        "scale",
+        "valid",
+        "update_id",
+        "seq_id",
+        "timestamp",
+        "bids",
+        "asks",
+        "max_depth",
+        "trimmed",
+    )
+
+    def __init__(
+        self,
+        symbol: str | None = None,
+        scale: TickScale | None = None,
+        top_levels: int = 0,
+        max_depth: int | None = None,
+    ):
+        if max_depth is not None and max_depth < 1:
+            raise ValueError(f"{max_depth=} must be a positive integer")
+        self.symbol = symbol
+        self.scale = scale
+        self.valid = False
+        self.update_id = None
+        self.seq_id = None
+        self.timestamp = None
+        self.bids = BookSide(descending=True, scale=scale, top_levels=top_levels)
+        self.asks = BookSide(descending=False, scale=scale, top_levels=top_levels)
+        self.max_depth = max_depth
+        self.trimmed = 0
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(symbol={self.symbol!r}, "
+            f"update_id={self.update_id}, best_bid={self.best_bid}, "
+            f"best_ask={self.best_ask}, depth={self.depth})"
+        )
+
+    def apply_snapshot(
+        self,
+        bids: Iterable[Sequence[str]],
+        asks: Iterable[Sequence[str]],
+        update_id: int | None = None,
+        seq_id: int | None = None,
+        timestamp: int | None = None,
+    ) -> None:
+        self.bids.load(bids)
+        self.asks.load(asks)
+        if self.max_depth is not None:
+            self.truncate(self.max_depth)
+        self.valid = True
+        self.update_id = update_id
+        self.seq_id = seq_id
+        self.timestamp = timestamp
+
+    def apply_delta(
+        self,
+        bids: Iterable[Sequence[str]],
+        asks: Iterable[Sequence[str]],
+        update_id: int | None = None,
+        seq_id: int | None = None,
+        timestamp: int | None = None,
+    ) -> None:
+        update = self.bids.update
+        for price, size in bids:
+            update(price, size)
+        update = self.asks.update
+        for price, size in asks:
+            update(price, size)
+        if self.max_depth is not None:
+            self.truncate(self.max_depth)
+        self.update_id = update_id
+        self.seq_id = seq_id
+        self.timestamp = timestamp
+
+    def truncate(self, depth: int) -> None:
+        """Removes the levels beyond the `depth` best ones of each side."""
+        self.trimmed += self.bids.truncate(depth) + self.asks.truncate(depth)
+
+    @property
+    def depth(self) -> Tuple[int, int]:
+        """Number of bid and ask levels."""
+        return len(self.bids), len(self.asks)
+
+    @property
+    def best_bid(self) -> Level | None:
+        return self.bids.best()
+
+    @property
+    def best_ask(self) -> Level | None:
+        return self.asks.best()
+
+    @property
+    def mid(self) -> float | None:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] + ask[0]) / 2
+
+    @property
+    def spread(self) -> float | None:
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return ask[0] - bid[0]
+
+    @property
+    def microprice(self) -> float | None:
+        """Mid price weighted by the size on the opposite side."""
+        bid, ask = self.bids.best(), self.asks.best()
+        if bid is None or ask is None:
+            return None
+        return (bid[0] * ask[1] + ask[0] * bid[1]) / (bid[1] + ask[1])
+
+    @property
+    def cumulative_depth(self) -> Tuple[float, float]:
+        """Total bid and ask sizes over the `top_levels` best levels."""
+        return self.bids.top_size, self.asks.top_size
+
+    @property
+    def imbalance(self) -> float | None:
+        """(bid size - ask size) / (bid size + ask size) over the `top_levels`
+        best levels, in [-1, 1].
+        """
+        bid_size, ask_size = self.bids.top_size, self.asks.top_size
+        if not bid_size + ask_size:
+            return None
+        return (bid_size - ask_size) / (bid_size + ask_size)
+
+    @property
+    def depth_vwap(self) -> Tuple[float | None, float | None]:
+        """Volume weighted average bid and ask prices over the `top_levels`
+        best levels.
+        """
+        bids, asks = self.bids, self.asks
+        return (
+            bids.top_notional / bids.top_size if bids.top_size else None,
+            asks.top_notional / asks.top_size if asks.top_size else None,
+        )
+
+    def vwap(self, size: float) -> Tuple[float | None, float | None]:
+        """Average prices to sell and to buy `size`, ie. to take it from the
+        bids and from the asks. None on a side holding less than `size`.
+        """
+        return self.bids.vwap(size), self.asks.vwap(size)
+
+    def top(self, n: int) -> Tuple[List[Level], List[Level]]:
+        """The `n` best bid and ask levels as (price, size)."""
+        return self.bids.levels(n), self.asks.levels(n)
+
+    def snapshot(self, depth: int | None = None) -> Dict[str, List[List[str]]]:
+        """The book as raw [price, size] strings, best levels first, under the
+        `b` and `a` keys.
+        """
+        return {"b": self.bids.raw(depth), "a": self.asks.raw(depth)}
+
+
+class OrderBookArrays:
+    """Fixed depth float64 arrays of an orderbook, sorted best first.
+
+    The four arrays of shape (depth,) are allocated once and overwritten by
+    every `update`. They are exposed as read-only views: consumers can
+    compute on them without copying, and must copy them to keep the values
+    of a given update. Missing levels have a NaN price and a size of 0.
+    Prices and sizes are in ticks and lots when the book has a `TickScale`.
+
+    Parameters
+    ----------
+
+    depth: int
+        Number of levels kept on each side.
+
+    topic: str
+        The topic the arrays are built from.
+    """
+
+    __slots__ = (
+        "topic",
+        "symbol",
+        "depth",
+        "update_id",
+        "seq_id",
+        "timestamp",
+        "bid_count",
+        "ask_count",
+        "_buffers",
+        "bid_prices",
+        "bid_sizes",
+        "ask_prices",
+        "ask_sizes",
+    )
+
+    def __init__(self, depth: int, topic: str | None = None):
+        self.topic = topic
+        self.symbol = None
+        self.depth = depth
+        self.update_id = None
+        self.seq_id = None
+        self.timestamp = None
+        self.bid_count = 0
+        self.ask_count = 0
+        self._buffers = np.full((4, depth), np.nan, dtype=np.float64)
+        self._buffers[1::2] = 0.0
+        views = []
+        for buffer in self._buffers:
+            view = buffer.view()
+            view.flags.writeable = False
+            views.append(view)
+        self.bid_prices, self.bid_sizes, self.ask_prices, self.ask_sizes = views
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(topic={self.topic!r}, depth={self.depth}, "
+            f"update_id={self.update_id}, levels=({self.bid_count}, {self.ask_count}))"
+        )
+
+    def update(self, book: OrderBook) -> "OrderBookArrays":
+        """Writes the `depth` best levels of `book` into the arrays."""
+        bid_prices, bid_sizes, ask_prices, ask_sizes = self._buffers
+        self.bid_count = book.bids.fill(bid_prices, bid_sizes)
+        self.ask_count = book.asks.fill(ask_prices, ask_sizes)
+        self.symbol = book.symbol
+        self.update_id = book.update_id
+        self.seq_id = book.seq_id
+        self.timestamp = book.timestamp
+        return self
+
+
+# Layout of a shared book segment: a header of int64 followed by the bid
+# prices, bid sizes, ask prices and ask sizes as float64 arrays of `depth`.
+_HEADER = ("version", "depth", "bid_count", "ask_count", "update_id", "timestamp")
+_HEADER_SIZE = 8 * 8
+
+
+def shared_book_name(exchange: str, category: str, topic: str) -> str:
+    """Name of the shared memory segment a book is published to."""
+    return f"cryptoex.{exchange}.{category}.{topic}"
+
+
+class SharedBookPublisher:
+    """Publishes an orderbook into a shared memory segment.
+
+    Writes follow a seqlock: the version in the header is odd while the book
+    is being written and even once it is consistent, so readers detect and
+    retry torn reads without any lock. There must be a single publisher per
+    segment.
+
+    Parameters
+    ----------
+
+    name: str
+        Name of the segment, see `shared_book_name`.
+
+    depth: int
+        Number of levels published on each side.
+
+    reclaim: bool
+        Whether an existing segment of the same name is taken over, ex. one
+        left over by a publisher that crashed. Otherwise a FileExistsError is
+        raised: another publisher may still be writing to it.
+    """
+
+    def __init__(self, name: str, depth: int, reclaim: bool = False):
+        self.name = name
+        self.depth = depth
+        try:
+            self._shm = SharedMemory(name, create=True, size=_segment_size(depth))
+        except FileExistsError:
+            if not reclaim:
+                raise FileExistsError(
+                    f"The shared book {name} already exists, it is either "
+                    f"published by another process or left over by a crash: "
+                    f"pass reclaim=True to take it over"
+                ) from None
+            self._shm = SharedMemory(name)
+            if self._shm.size < _segment_size(depth):
+                self._shm.close()
+                raise
+        self._header, self._data = _segment_views(self._shm, depth)
+        self._header[:] = 0
+        self._header[1] = depth
+        self._data[0::2] = np.nan
+        self._data[1::2] = 0.0
+
+    def publish(self, book: OrderBook) -> None:
+        header = self._header
+        bid_prices, bid_sizes, ask_prices, ask_sizes = self._data
+        header[0] += 1
+        header[2] = book.bids.fill(bid_prices, bid_sizes)
+        header[3] = book.asks.fill(ask_prices, ask_sizes)
+        header[4] = book.update_id or 0
+        header[5] = book.timestamp or 0
+        header[0] += 1
+
+    def close(self, unlink: bool = True) -> None:
+        """Releases the segment, and removes it unless `unlink` is False."""
+        self._header = self._data = None
+        self._shm.close()
+        if unlink:
+            self._shm.unlink()
+
+
+class SharedBookReader:
+    """Reads the books published by a `SharedBookPublisher`, possibly from
+    another process.
+
+    Parameters
+    ----------
+
+    name: str
+        Name of the segment, see `shared_book_name`.
+    """
+
+    def __init__(self, name: str):
+        self.name = name
+        self._shm = SharedMemory(name, track=False)
+        depth = int(np.ndarray((2,), np.int64, self._shm.buf)[1])
+        self.depth = depth
+        self._header, self._data = _segment_views(self._shm, depth)
+
+    @property
+    def version(self) -> int:
+        """Incremented twice by every publication."""
+        return int(self._header[0])
+
+    def read(
+        self, out: OrderBookArrays | None = None, timeout: float = 1.0
+    ) -> OrderBookArrays:
+        """Copies a consistent snapshot of the book into `out` (new arrays by
+        default) and returns it. `out.update_id` is None until a first book is
+        published.
+        """
+        if out is None:
+            out = OrderBookArrays(self.depth, self.name)
+        header = self._header
+        buffers = out._buffers
+        deadline = time.monotonic() + timeout
+        while True:
+            version = int(header[0])
+            if not version & 1:
+                np.copyto(buffers, self._data)
+                meta = header[2:6].tolist()
+                if int(header[0]) == version:
+                    break
+            if time.monotonic() > deadline:
+                raise TimeoutError(f"Unable to read a consistent book from {self.name}")
+            time.sleep(0)
+
+        out.bid_count, out.ask_count, update_id, timestamp = meta
+        out.update_id = update_id if version else None
+        out.timestamp = timestamp if version else None
+        return out
+
+    def close(self) -> None:
+        self._header = self._data = None
+        self._shm.close()
+
+
+def _segment_size(depth: int) -> int:
+    return _HEADER_SIZE + 4 * depth * 8
+
+
+def _segment_views(shm: SharedMemory, depth: int) -> Tuple[np.ndarray, np.ndarray]:
+    header = np.ndarray((len(_HEADER),), np.int64, shm.buf)
+    data = np.ndarray((4, depth), np.float64, shm.buf, offset=_HEADER_SIZE)
+    return header, data
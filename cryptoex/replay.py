@@ -0,0 +1,311 @@
+"""Offline replay of recorded orderbook messages.
+
+Raw QUOTES files hold one exchange message (snapshot or delta) per line, as
+received from the orderbook stream. The replay decodes each line, applies it
+to an incremental `OrderBook` per topic and writes the resulting fixed depth
+snapshot directly into preallocated columnar NumPy buffers: no exchange
+object is needed and nothing is serialised back to JSON.
+
+Messages are expected in the Bybit format: topic, type, ts, cts and data
+with the s, b, a, u and seq fields.
+"""
+
+import logging
+from typing import Any, Dict, Iterable, List, Tuple
+
+import numpy as np
+import pandas as pd
+
+from cryptoex.codecs import get_codec
+from cryptoex.orderbook import OrderBook
+from cryptoex.ticks import TickScale
+
+_logger = logging.getLogger(__name__)
+
+QUOTE_FIELDS = ("bid_price", "bid_size", "ask_price", "ask_size")
+
+
+def quote_headers(depth: int) -> List[str]:
+    """Column names of the snapshots: bid_price_1..depth, bid_size_1..depth,
+    ask_price_1..depth then ask_size_1..depth, level 1 being the best.
+    """
+    return [f"{field}_{i}" for field in QUOTE_FIELDS for i in range(1, depth + 1)]
+
+
+class QuoteColumns:
+    """Fixed depth orderbook snapshots stored column wise.
+
+    Each row is the state of a book after a message. The levels are kept in
+    a float64 array of shape (rows, 4 * depth) whose columns follow
+    `quote_headers`: missing levels have a NaN price and a size of 0. The
+    ids and timestamps are int64 columns where missing values are -1. The
+    arrays grow by doubling.
+
+    Parameters
+    ----------
+
+    depth: int
+        Number of levels kept on each side.
+
+    capacity: int
+        Number of rows allocated up front.
+
+    chunk_size: int
+        Number of rows whose ids and timestamps are buffered in a list before
+        they are written to their array.
+    """
+
+    __slots__ = (
+        "depth",
+        "topics",
+        "chunk_size",
+        "_topic_codes",
+        "_size",
+        "_meta_size",
+        "_meta",
+        "_levels",
+        "_pending",
+    )
+
+    META_COLUMNS = (
+        "topic",
+        "is_snapshot",
+        "timestamp",
+        "engine_timestamp",
+        "update_id",
+        "seq_id",
+    )
+
+    def __init__(self, depth: int, capacity: int = 65536, chunk_size: int = 4096):
+        self.depth = depth
+        self.topics: List[str] = []
+        self.chunk_size = chunk_size
+        self._topic_codes: Dict[str, int] = {}
+        self._size = 0
+        self._meta_size = 0
+        capacity = max(capacity, 1)
+        self._meta = np.empty((capacity, len(self.META_COLUMNS)), dtype=np.int64)
+        self._levels = np.empty((capacity, 4 * depth), dtype=np.float64)
+        self._pending: List[int] = []
+
+    def __len__(self) -> int:
+        return self._size
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}(depth={self.depth}, rows={self._size}, "
+            f"topics={self.topics})"
+        )
+
+    def new_row(self) -> np.ndarray:
+        """An empty row, to be filled by `BookSide.mirror`."""
+        row = np.full(4 * self.depth, np.nan, dtype=np.float64)
+        row.reshape(4, self.depth)[1::2] = 0.0
+        return row
+
+    def topic_code(self, topic: str) -> int:
+        code = self._topic_codes.get(topic)
+        if code is None:
+            code = self._topic_codes[topic] = len(self.topics)
+            self.topics.append(topic)
+        return code
+
+    def append(
+        self,
+        row: np.ndarray,
+        topic: int,
+        is_snapshot: bool,
+        timestamp: int,
+        engine_timestamp: int,
+        update_id: int,
+        seq_id: int,
+    ) -> None:
+        """Copies `row` as a new row. `topic` is the code returned by
+        `topic_code`.
+        """
+        i = self._size
+        if i == len(self._levels):
+            self._grow()
+        self._levels[i] = row
+        self._size = i + 1
+        pending = self._pending
+        pending += (topic, is_snapshot, timestamp, engine_timestamp, update_id, seq_id)
+        if len(pending) >= self.chunk_size * len(self.META_COLUMNS):
+            self.flush()
+
+    def flush(self) -> None:
+        """Writes the buffered ids and timestamps to their array."""
+        pending = self._pending
+        if not pending:
+            return
+        meta = np.fromiter(pending, np.int64, len(pending))
+        self._meta[self._meta_size : self._size] = meta.reshape(
+            -1, len(self.META_COLUMNS)
+        )
+        self._meta_size = self._size
+        pending.clear()
+
+    def _grow(self) -> None:
+        capacity = 2 * len(self._levels)
+        for name in ("_meta", "_levels"):
+            previous = getattr(self, name)
+            array = np.empty((capacity, previous.shape[1]), dtype=previous.dtype)
+            array[: len(previous)] = previous
+            setattr(self, name, array)
+
+    @property
+    def levels(self) -> np.ndarray:
+        """The (rows, 4 * depth) levels, without copy."""
+        return self._levels[: self._size]
+
+    def column(self, name: str) -> np.ndarray:
+        """One of `META_COLUMNS`, without copy."""
+        self.flush()
+        return self._meta[: self._size, self.META_COLUMNS.index(name)]
+
+    def side(self, field: str) -> np.ndarray:
+        """The (rows, depth) view of one of `QUOTE_FIELDS`."""
+        start = QUOTE_FIELDS.index(field) * self.depth
+        return self.levels[:, start : start + self.depth]
+
+    def to_frames(self) -> Tuple[pd.DataFrame, pd.DataFrame]:
+        """Builds the quotes and metadata DataFrames, both indexed by the
+        engine timestamp.
+        """
+        index = pd.Index(self.column("engine_timestamp"), name="engine_timestamp")
+        quotes = pd.DataFrame(
+            self.levels, index=index, columns=quote_headers(self.depth)
+        )
+        quotes.columns.name = "Depth"
+        meta = pd.DataFrame(
+            {
+                "seq_id": self.column("seq_id"),
+                "update_id": self.column("update_id"),
+                "topic_name": pd.Categorical.from_codes(
+                    self.column("topic"), categories=self.topics
+                ),
+                "data_type": np.where(
+                    self.column("is_snapshot"), "snapshot", "delta"
+                ),
+                "system_timestamp": self.column("timestamp"),
+            },
+            index=index,
+        )
+        return quotes, meta
+
+
+class QuoteReplay:
+    """Rebuilds orderbooks from recorded messages into `QuoteColumns`.
+
+    A book is kept per topic, with a row mirroring its `depth` best levels
+    (see `BookSide.mirror`): a message only updates the levels it carries
+    and the row is then copied to the columns. Deltas received before the
+    first snapshot of their topic are skipped. Gaps in the update ids cannot
+    be healed offline: they are counted and logged, and the book keeps being
+    updated until the next snapshot.
+
+    Parameters
+    ----------
+
+    depth: int
+        Number of levels written on each side.
+
+    scale: TickScale
+        When given, prices and sizes are written as ticks and lots.
+
+    max_depth: int
+        Maximum number of levels kept per side by the books, see `OrderBook`.
+
+    codec: str
+        JSON codec used to decode the lines, see `cryptoex.codecs.get_codec`.
+
+    capacity: int
+        Initial number of rows of the columns.
+    """
+
+    def __init__(
+        self,
+        depth: int,
+        *,
+        scale: TickScale | None = None,
+        max_depth: int | None = None,
+        codec: str = "auto",
+        capacity: int = 65536,
+    ):
+        self.depth = depth
+        self.scale = scale
+        self.max_depth = max_depth
+        self.loads = get_codec(codec).loads
+        self.books: Dict[str, OrderBook] = {}
+        self.columns = QuoteColumns(depth, capacity)
+        self._rows: Dict[str, Tuple[np.ndarray, int]] = {}
+        self.skipped = 0
+        self.gaps = 0
+
+    def _add_topic(self, topic: str, symbol: str) -> OrderBook:
+        book = self.books[topic] = OrderBook(
+            symbol, self.scale, max_depth=self.max_depth
+        )
+        row = self.columns.new_row()
+        sides = row.reshape(4, self.depth)
+        book.bids.mirror(sides[0], sides[1])
+        book.asks.mirror(sides[2], sides[3])
+        self._rows[topic] = (row, self.columns.topic_code(topic))
+        return book
+
+    def apply(self, message: Dict[str, Any]) -> bool:
+        """Applies a message to the book of its topic and writes the book.
+        Returns False if the message was skipped.
+        """
+        topic = message["topic"]
+        data = message["data"]
+        book = self.books.get(topic)
+        is_snapshot = message["type"] == "snapshot"
+        seq = data.get("seq", -1)
+        if is_snapshot:
+            if book is None:
+                book = self._add_topic(topic, data["s"])
+            book.apply_snapshot(data["b"], data["a"], data["u"], seq)
+        elif book is None:
+            self.skipped += 1
+            return False
+        else:
+            uid = data["u"]
+            if uid != book.update_id + 1:
+                self.gaps += 1
+                _logger.warning(
+                    f"Gap in the update ids of {topic}: {book.update_id} -> {uid}"
+                )
+            book.apply_delta(data["b"], data["a"], uid, seq)
+
+        row, code = self._rows[topic]
+        self.columns.append(
+            row,
+            code,
+            is_snapshot,
+            message.get("ts", -1),
+            message.get("cts", -1),
+            book.update_id,
+            seq,
+        )
+        return True
+
+    def replay(self, lines: Iterable[str | bytes]) -> QuoteColumns:
+        """Decodes and applies every non empty line."""
+        loads, apply = self.loads, self.apply
+        for line in lines:
+            if line.strip():
+                apply(loads(line))
+        self.columns.flush()
+        return self.columns
+
+    def replay_file(self, path: str) -> QuoteColumns:
+        with open(path, "rb") as file:
+            return self.replay(file)
+
+
+def replay_quotes_file(path: str, depth: int, **kwargs) -> QuoteColumns:
+    """Replays a raw QUOTES file, see `QuoteReplay` for the keyword
+    arguments.
+    """
+    return QuoteReplay(depth, **kwargs).replay_file(path)
@@ -0,0 +1,127 @@
+"""Integer tick and lot representation of prices and sizes.
+
+Exchanges send prices and sizes as decimal strings. Given the tick size and
+the quantity step of an instrument, they are converted exactly (without going
+through floats) to integers counting ticks and lots, which hash and compare
+fast and do not accumulate float errors.
+"""
+
+from decimal import Decimal
+from typing import Any, Dict, Iterable, List, Sequence, Tuple
+
+
+def _decimals(step: str) -> int:
+    return len(step.partition(".")[2])
+
+
+def _to_units(text: str, decimals: int) -> int:
+    """Returns the decimal string `text` multiplied by 10**decimals."""
+    whole, _, fraction = text.partition(".")
+    if len(fraction) > decimals:
+        if fraction[decimals:].strip("0"):
+            raise ValueError(f"{text=} has more than {decimals} decimals")
+        fraction = fraction[:decimals]
+    try:
+        return int(whole + fraction.ljust(decimals, "0"))
+    except ValueError:
+        # Exponent notation
+        units = Decimal(text).scaleb(decimals)
+        if units != units.to_integral_value():
+            raise ValueError(f"{text=} has more than {decimals} decimals")
+        return int(units)
+
+
+class TickScale:
+    """Converts the prices and sizes of an instrument to integer ticks and lots.
+
+    A price is converted to the number of `tick_size` it represents and a size
+    to the number of `lot_size`. Values that are not a multiple of the step
+    raise a `ValueError`.
+
+    Parameters
+    ----------
+
+    tick_size: str
+        The price step of the instrument, ex: 0.10
+
+    lot_size: str
+        The quantity step of the instrument, ex: 0.001
+    """
+
+    __slots__ = (
+        "tick_size",
+        "lot_size",
+        "_price_decimals",
+        "_tick_units",
+        "_size_decimals",
+        "_lot_units",
+    )
+
+    def __init__(self, tick_size: str, lot_size: str):
+        self.tick_size = tick_size
+        self.lot_size = lot_size
+        self._price_decimals = _decimals(tick_size)
+        self._tick_units = _to_units(tick_size, self._price_decimals)
+        self._size_decimals = _decimals(lot_size)
+        self._lot_units = _to_units(lot_size, self._size_decimals)
+        if self._tick_units <= 0 or self._lot_units <= 0:
+            raise ValueError(f"Invalid steps {tick_size=} and {lot_size=}")
+
+    def __repr__(self) -> str:
+        return (
+            f"{type(self).__name__}("
+            f"tick_size={self.tick_size!r}, lot_size={self.lot_size!r})"
+        )
+
+    @classmethod
+    def from_instrument(cls, instrument: Dict[str, Any]) -> "TickScale":
+        """Builds the scale from the details of an instrument, either as
+        returned by `fetch_instruments_details` or flattened by
+        `format_instruments`. Spot instruments have no quantity step, their
+        base precision is used instead.
+        """
+        prices = instrument.get("price_details", instrument)
+        sizes = instrument.get("lot_size_details", instrument)
+        lot_size = sizes.get("quantity_step") or sizes["base_precision"]
+        return cls(prices["tick_size"], lot_size)
+
+    def to_ticks(self, price: str) -> int:
+        ticks, remainder = divmod(
+            _to_units(price, self._price_decimals), self._tick_units
+        )
+        if remainder:
+            raise ValueError(f"{price=} is not a multiple of {self.tick_size}")
+        return ticks
+
+    def to_lots(self, size: str) -> int:
+        lots, remainder = divmod(_to_units(size, self._size_decimals), self._lot_units)
+        if remainder:
+            raise ValueError(f"{size=} is not a multiple of {self.lot_size}")
+        return lots
+
+    def to_levels(self, levels: Iterable[Sequence[str]]) -> List[Tuple[int, int]]:
+        """Converts [price, size] string pairs to (ticks, lots)."""
+        to_ticks, to_lots = self.to_ticks, self.to_lots
+        return [(to_ticks(price), to_lots(size)) for price, size in levels]
+
+    def price(self, ticks: int) -> float:
+        return ticks * self._tick_units / 10**self._price_decimals
+
+    def size(self, lots: int) -> float:
+        return lots * self._lot_units / 10**self._size_decimals
+
+    def format_price(self, ticks: int) -> str:
+        """The exact decimal string of a price in ticks."""
+        return _format_units(ticks * self._tick_units, self._price_decimals)
+
+    def format_size(self, lots: int) -> str:
+        """The exact decimal string of a size in lots."""
+        return _format_units(lots * self._lot_units, self._size_decimals)
+
+
+def _format_units(units: int, decimals: int) -> str:
+    if decimals == 0:
+        return str(units)
+    sign = "-" if units < 0 else ""
+    digits = str(abs(units)).rjust(decimals + 1, "0")
+    return f"{sign}{digits[:-decimals]}.{digits[-decimals:]}"
@@ -1,6 +1,8 @@
-import json
 import time
 from functools import wraps
+from cryptoex.codecs import JSONCodec
+
+_default_codec = JSONCodec()
 
 
 def assign_dtypes(default="float", **dtypes):
@@ -27,8 +29,8 @@ def assign_dtypes(default="float", **dtypes):
     return decorator
 
 
-def build_message(**kwargs) -> str:
-    return json.dumps(kwargs)
+def build_message(*, codec: JSONCodec | None = None, **kwargs) -> str:
+    return (codec or _default_codec).dumps(kwargs)
 
 
 def get_timestamp() -> int: